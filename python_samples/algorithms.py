@@ -3,6 +3,9 @@
 
 """ algorithms and data structure operations """
 
+import random
+import timeit
+
 # SEARCHING
 
 
@@ -17,6 +20,259 @@ def search_employees_manager(employee, managers):
     return None
     # This is an O(n) complexity function in the worst case.
 
+
+class EmployeeDirectory:
+    """
+    Directory of employees built from a manager:[employees] dictionary.
+    Employee names are normalized once, into an employee:manager index, so
+    looking up a manager is O(1) instead of a scan of every employee list.
+    As in search_employees_manager, the first manager wins for an employee
+    listed more than once.
+    Managers can be employees of other managers, which makes an org chart.
+    Transitive queries use the depth of each employee and binary lifting
+    tables (the 2^k-th manager of each employee), built on the first query
+    and dropped whenever an employee is added, moved or removed.
+    """
+
+    def __init__(self, managers=None):
+        """ Builds the index from a manager:[employees] dictionary """
+        self._index = {}
+        # Employees of each manager, as normalized name:name pairs
+        self._reports = {}
+        # Org chart tables, built on demand
+        self._tables = None
+
+        index = self._index
+        normalize = self._normalize
+        for manager, employees in (managers or {}).items():
+            reports = self._reports.setdefault(manager, {})
+            for employee in employees:
+                employee_cleaned = normalize(employee)
+                if employee_cleaned not in index:
+                    index[employee_cleaned] = manager
+                    reports[employee_cleaned] = employee
+
+    @staticmethod
+    def _normalize(name):
+        """ Normalizes a name as search_employees_manager does """
+        return name.strip().lower().title()
+
+    def __len__(self):
+        """ Returns the number of employees """
+        return len(self._index)
+
+    def __contains__(self, employee):
+        """ Checks whether the employee is in the directory """
+        return self._normalize(employee) in self._index
+
+    def manager_of(self, employee):
+        """ Returns the employee's manager, or None if it is not found """
+        return self._index.get(self._normalize(employee))
+
+    def managers_of(self, employees):
+        """ Returns the manager of each employee (None if it is not found) """
+        index = self._index
+        normalize = self._normalize
+        return [index.get(normalize(employee)) for employee in employees]
+
+    def employees_of(self, manager):
+        """ Returns the employees of a manager """
+        return list(self._reports.get(manager, {}).values())
+
+    def add_employee(self, employee, manager):
+        """ Adds an employee reporting to the manager """
+        employee_cleaned = self._normalize(employee)
+        if employee_cleaned in self._index:
+            raise ValueError(f"{employee} is already in the directory!")
+
+        self._index[employee_cleaned] = manager
+        self._reports.setdefault(manager, {})[employee_cleaned] = employee
+        self._tables = None
+
+    def remove_employee(self, employee):
+        """ Removes an employee and returns its manager """
+        employee_cleaned = self._normalize(employee)
+        if employee_cleaned not in self._index:
+            raise KeyError(f"{employee} is not in the directory!")
+
+        manager = self._index.pop(employee_cleaned)
+        del self._reports[manager][employee_cleaned]
+        self._tables = None
+        return manager
+
+    def move_employee(self, employee, manager):
+        """ Moves an employee to another manager """
+        employee_cleaned = self._normalize(employee)
+        if employee_cleaned not in self._index:
+            raise KeyError(f"{employee} is not in the directory!")
+
+        name = self._reports[self._index[employee_cleaned]][employee_cleaned]
+        self.remove_employee(employee)
+        self.add_employee(name, manager)
+
+    def _build_tables(self):
+        """
+        Builds the names, depths and binary lifting tables of the org chart.
+        Raises ValueError if an employee is (indirectly) its own manager.
+        """
+        names = {}
+        parent = {}
+        for manager, reports in self._reports.items():
+            manager_cleaned = self._normalize(manager)
+            for employee_cleaned, employee in reports.items():
+                parent[employee_cleaned] = manager_cleaned
+                names.setdefault(employee_cleaned, employee)
+        # Managers are named as in the dictionary, as manager_of does
+        for manager in self._reports:
+            names[self._normalize(manager)] = manager
+
+        # Depths are memoized along each walk up to a known node
+        depth = {}
+        for node in names:
+            path = []
+            visiting = set()
+            while node is not None and node not in depth:
+                if node in visiting:
+                    raise ValueError(f"{names[node]} is in a management cycle!")
+                visiting.add(node)
+                path.append(node)
+                node = parent.get(node)
+
+            level = -1 if node is None else depth[node]
+            for node in reversed(path):
+                level += 1
+                depth[node] = level
+
+        # jumps[k] maps each employee to its 2^k-th manager, if there is one
+        jumps = [parent]
+        while True:
+            last = jumps[-1]
+            following = {node: last[middle] for (node, middle) in last.items() if middle in last}
+            if not following:
+                break
+            jumps.append(following)
+
+        return (names, depth, jumps)
+
+    def _org_chart(self):
+        """ Returns the org chart tables, building them if needed """
+        if self._tables is None:
+            self._tables = self._build_tables()
+        return self._tables
+
+    def manager_chain(self, employee):
+        """ Returns the managers of an employee, from its manager to the top """
+        (names, _, jumps) = self._org_chart()
+        parent = jumps[0]
+
+        chain = []
+        node = parent.get(self._normalize(employee))
+        while node is not None:
+            chain.append(names[node])
+            node = parent.get(node)
+
+        return chain
+
+    def lowest_common_manager(self, employee_a, employee_b):
+        """
+        Returns the lowest manager of both employees, in O(log depth).
+        If one of them manages the other, it is returned.
+        Returns None if there is no common manager.
+        """
+        (names, depth, jumps) = self._org_chart()
+        node_a = self._normalize(employee_a)
+        node_b = self._normalize(employee_b)
+        if node_a not in depth or node_b not in depth:
+            return None
+
+        if depth[node_a] < depth[node_b]:
+            (node_a, node_b) = (node_b, node_a)
+
+        # Lift the deepest employee to the depth of the other one
+        difference = depth[node_a] - depth[node_b]
+        level = 0
+        while difference:
+            if difference & 1:
+                node_a = jumps[level][node_a]
+            difference >>= 1
+            level += 1
+
+        if node_a == node_b:
+            return names[node_a]
+
+        # Lift both while their managers are different
+        for jump in reversed(jumps):
+            manager_a = jump.get(node_a)
+            if manager_a is not None and manager_a != jump.get(node_b):
+                (node_a, node_b) = (manager_a, jump[node_b])
+
+        manager = jumps[0].get(node_a)
+        return None if manager is None else names[manager]
+
+
+def benchmark_employee_directory(size=100000, lookups=1000):  # pragma: no cover
+    """ Compares looking up managers with search_employees_manager and EmployeeDirectory """
+    rand = random.Random(size)
+    managers = {}
+    for number in range(size):
+        managers.setdefault(f'Manager{number % 1000}', []).append(f'Employee{number}')
+    names = [f' employee{rand.randrange(size)} ' for _ in range(lookups)]
+
+    build = min(timeit.repeat(lambda: EmployeeDirectory(managers), number=1, repeat=3))
+    directory = EmployeeDirectory(managers)
+
+    scan = min(timeit.repeat(
+        lambda: [search_employees_manager(name, managers) for name in names], number=1, repeat=3))
+    indexed = min(timeit.repeat(
+        lambda: [directory.manager_of(name) for name in names], number=1, repeat=3))
+
+    print(f'Building the directory of {size} employees: {build * 1000:.2f} ms')
+    print(f'{"variant":>26} {"per lookup (us)":>16}')
+    print(f'{"search_employees_manager":>26} {scan / lookups * 1e6:>16.2f}')
+    print(f'{"EmployeeDirectory":>26} {indexed / lookups * 1e6:>16.2f}')
+
+
+def benchmark_org_chart(size=100000, queries=20):  # pragma: no cover
+    """
+    Compares finding the lowest common manager by walking both management
+    chains with search_employees_manager and with EmployeeDirectory.
+    """
+    rand = random.Random(size)
+    managers = {}
+    for number in range(1, size):
+        managers.setdefault(f'Employee{rand.randrange(number)}', []).append(f'Employee{number}')
+    pairs = [(f'Employee{rand.randrange(size)}', f'Employee{rand.randrange(size)}')
+             for _ in range(queries)]
+
+    def scan_chain(employee):
+        chain = [employee]
+        manager = search_employees_manager(employee, managers)
+        while manager is not None:
+            chain.append(manager)
+            manager = search_employees_manager(manager, managers)
+        return chain
+
+    def scan_common_manager(employee_a, employee_b):
+        chain_a = set(scan_chain(employee_a))
+        return next((manager for manager in scan_chain(employee_b) if manager in chain_a), None)
+
+    # The first query builds the org chart tables
+    build = min(timeit.repeat(
+        lambda: EmployeeDirectory(managers).lowest_common_manager(*pairs[0]), number=1, repeat=3))
+    directory = EmployeeDirectory(managers)
+    directory.lowest_common_manager(*pairs[0])
+
+    scan = min(timeit.repeat(
+        lambda: [scan_common_manager(*pair) for pair in pairs], number=1, repeat=3))
+    lifted = min(timeit.repeat(
+        lambda: [directory.lowest_common_manager(*pair) for pair in pairs], number=1, repeat=3))
+
+    print(f'Building the directory and org chart of {size} employees: {build * 1000:.2f} ms')
+    print(f'{"variant":>26} {"per query (us)":>15}')
+    print(f'{"search_employees_manager":>26} {scan / queries * 1e6:>15.2f}')
+    print(f'{"EmployeeDirectory":>26} {lifted / queries * 1e6:>15.2f}')
+
+
 # SWAPPING
 
 
@@ -11,8 +11,24 @@ __maintainer__ = "Marco Espinosa"
 __email__ = "hi@marcoespinosa.es"
 __status__ = "Development"
 
-from typing import List
+from array import array
+from bisect import bisect_left
+from typing import Iterator, List, Tuple
 from typing_extensions import Self
+import random
+import threading
+import time
+import tracemalloc
+
+
+# Shape flags of a flattened node
+HAS_LEFT_CHILD = 1
+HAS_RIGHT_CHILD = 2
+
+
+def _rebuild_tree(cls, values: List, shape: bytes):
+    """ Unpickling function of the trees """
+    return cls.from_flat(values, shape)
 
 
 class BinaryTreeNode:
@@ -22,8 +38,11 @@ class BinaryTreeNode:
     How does it works? A binary tree is an ordered tree which grows
     in ascendant mode. So, the root is the smaller value and greater
     values are saved in to the right nodes.
+    Nodes use __slots__ instead of a __dict__ to save memory.
     """
 
+    __slots__ = ('data', 'right_child', 'left_child')
+
     def __init__(self, data) -> None:
         # Node value
         self.data = data
@@ -32,6 +51,120 @@ class BinaryTreeNode:
         # Left child
         self.left_child = None
 
+    @classmethod
+    def from_sorted(cls, iterable) -> Self:
+        """
+        Builds a perfectly balanced tree from sorted values in O(n).
+        The middle value of each range is the root of its subtree.
+        Duplicated values are ignored, as insert does.
+        """
+        values = []
+        for value in iterable:
+            if values:
+                if value < values[-1]:
+                    raise ValueError("Values have to be sorted in ascending order!")
+                if value == values[-1]:
+                    continue
+            values.append(value)
+
+        if not values:
+            return cls(None)
+
+        return cls._build_balanced(values, 0, len(values) - 1)
+
+    @classmethod
+    def from_iterable(cls, iterable) -> Self:
+        """ Sorts the values and builds a perfectly balanced tree """
+        return cls.from_sorted(sorted(iterable))
+
+    @classmethod
+    def _build_balanced(cls, values: List, low: int, high: int) -> Self:
+        """ Auxiliary function to build the subtree of values[low:high + 1] """
+        middle = (low + high) // 2
+        node = cls(values[middle])
+
+        if low < middle:
+            node.left_child = cls._build_balanced(values, low, middle - 1)
+        if middle < high:
+            node.right_child = cls._build_balanced(values, middle + 1, high)
+
+        node._update()
+        return node
+
+    def _update(self) -> None:
+        """ Hook to refresh the data augmented from the children """
+
+    def _is_empty(self) -> bool:
+        """ Hook telling whether the node is the root of an empty tree """
+        return False
+
+    def __reduce__(self):
+        """
+        Pickles the tree flattened, so deep trees do not reach
+        the recursion limit of pickle.
+        """
+        return (_rebuild_tree, (type(self),) + self.flatten())
+
+    def flatten(self) -> Tuple[List, bytes]:
+        """
+        Flattens the tree into its values in pre-order and its shape.
+        The shape packs two bits per node (HAS_LEFT_CHILD, HAS_RIGHT_CHILD),
+        four nodes per byte.
+        """
+        values = []
+        shape = bytearray()
+        stack = [] if self._is_empty() else [self]
+        position = 0
+
+        while stack:
+            node = stack.pop()
+            values.append(node.data)
+
+            flags = 0
+            if node.right_child is not None:
+                flags |= HAS_RIGHT_CHILD
+                stack.append(node.right_child)
+            if node.left_child is not None:
+                flags |= HAS_LEFT_CHILD
+                stack.append(node.left_child)
+
+            if position % 4 == 0:
+                shape.append(0)
+            shape[-1] |= flags << (2 * (position % 4))
+            position += 1
+
+        return (values, bytes(shape))
+
+    @classmethod
+    def from_flat(cls, values: List, shape: bytes) -> Self:
+        """ Builds a tree from the values in pre-order and the shape of flatten """
+        if not values:
+            return cls(None)
+
+        nodes = [cls(value) for value in values]
+        # Nodes waiting for a child, the left one is popped first
+        stack = []
+
+        for (position, node) in enumerate(nodes):
+            if position > 0:
+                (parent, is_left) = stack.pop()
+                if is_left:
+                    parent.left_child = node
+                else:
+                    parent.right_child = node
+
+            flags = (shape[position // 4] >> (2 * (position % 4))) & 3
+            if flags & HAS_RIGHT_CHILD:
+                stack.append((node, False))
+            if flags & HAS_LEFT_CHILD:
+                stack.append((node, True))
+
+        # In reversed pre-order, children are always updated before their parent
+        for node in reversed(nodes):
+            node._update()
+
+        return nodes[0]
+
     def __str__(self) -> str:
         """" String representation of the Node class """
         return str(self.data)
@@ -67,49 +200,115 @@ class BinaryTreeNode:
         else:
             self.data = data
 
-    def print(self): # pragma: no cover
-        """ Print nodes recursively """
-        if self.left_child:
-            self.left_child.print()
+    def __iter__(self) -> Iterator:
+        """ Values iterator, in order """
+        return self.iter_in_order()
 
-        print(self.data, end=' ')
+    def print(self): # pragma: no cover
+        """ Print nodes in order """
+        for data in self:
+            print(data, end=' ')
 
-        if self.right_child:
-            self.right_child.print()
+    def iter_in_order(self) -> Iterator:
+        """
+        Lazy traversal order: Left->Root->Right.
+        It uses an explicit stack, so the extra memory is O(height)
+        and deep trees do not reach the recursion limit.
+        """
+        stack = []
+        node = None if self._is_empty() else self
+
+        while stack or node is not None:
+            # Go down to the leftmost node, stacking the path
+            while node is not None:
+                stack.append(node)
+                node = node.left_child
+
+            node = stack.pop()
+            yield node.data
+            node = node.right_child
+
+    def iter_pre_order(self) -> Iterator:
+        """ Lazy traversal pre-order: Root->Left->Right """
+        stack = [] if self._is_empty() else [self]
+
+        while stack:
+            node = stack.pop()
+            yield node.data
+
+            # Right child is stacked first to be visited last
+            if node.right_child is not None:
+                stack.append(node.right_child)
+            if node.left_child is not None:
+                stack.append(node.left_child)
+
+    def iter_post_order(self) -> Iterator:
+        """ Lazy traversal post-order: Left->Right->Root """
+        stack = []
+        node = None if self._is_empty() else self
+        last_visited = None
+
+        while stack or node is not None:
+            if node is not None:
+                stack.append(node)
+                node = node.left_child
+                continue
+
+            top = stack[-1]
+            # Visit the right subtree before the node, if not done yet
+            if top.right_child is not None and top.right_child is not last_visited:
+                node = top.right_child
+            else:
+                yield top.data
+                last_visited = stack.pop()
 
     def in_order_traversal(self, root: Self) -> List:
         """ Traversal order: Left->Root->Right """
-        res = []
-        if root:
-            res = self.in_order_traversal(root.left_child)
-            res.append(root.data)
-            res += self.in_order_traversal(root.right_child)
-
-        return res
+        return list(root.iter_in_order()) if root is not None else []
 
     def pre_order_traversal(self, root: Self) -> List:
         """ Traversal pre-order: Root->Left->Right """
-        res = []
-        if root:
-            res.append(root.data)
-            res += self.pre_order_traversal(root.left_child)
-            res += self.pre_order_traversal(root.right_child)
-
-        return res
+        return list(root.iter_pre_order()) if root is not None else []
 
     def post_order_traversal(self, root: Self) -> List:
         """ Traversal post-order: Left->Right->Root """
-        res = []
-        if root:
-            res = self.post_order_traversal(root.left_child)
-            res += self.post_order_traversal(root.right_child)
-            res.append(root.data)
+        return list(root.iter_post_order()) if root is not None else []
+
+    def range(self, low, high) -> Iterator:
+        """
+        Lazy iterator of the values between low and high (both included),
+        in order. Subtrees out of the range are pruned, so only
+        O(height + output) nodes are visited.
+        """
+        if self.data is None:
+            return
+
+        stack = []
+        node = self
+
+        while stack or node is not None:
+            while node is not None:
+                if node.data < low:
+                    # The whole left subtree is smaller than low
+                    node = node.right_child
+                else:
+                    stack.append(node)
+                    node = node.left_child
+
+            if not stack:
+                return
+
+            node = stack.pop()
+            if node.data > high:
+                return
 
-        return res
+            yield node.data
+            node = node.right_child
 
     def search(self, root: Self, data):
         """ Search data in the binary tree """
-        if root is not None:
+        # The root of an empty tree has no data
+        if root is not None and root.data is not None:
             if root.data == data:
                 return True
 
@@ -120,6 +319,500 @@ class BinaryTreeNode:
 
         return False
 
+    def search_many(self, keys) -> List[bool]:
+        """
+        Searches many keys in a single descent of the tree.
+        The keys are sorted, and each node splits the sorted keys it
+        receives between its left and right subtrees, so the top of the
+        tree is compared once instead of once per key. Only the nodes on
+        the paths to the keys are visited, which costs at most
+        O(min(m * height, n * log m)) for m keys and n nodes.
+        Returns whether each key exists, in the same order as keys.
+        """
+        keys = list(keys)
+        probes = sorted(set(keys))
+        found = set()
+
+        stack = [(self, 0, len(probes))] if self.data is not None and probes else []
+        while stack:
+            (node, low, high) = stack.pop()
+
+            # probes[low:index] go to the left subtree, the rest to the right one
+            index = bisect_left(probes, node.data, low, high)
+            if index < high and probes[index] == node.data:
+                found.add(node.data)
+                right_low = index + 1
+            else:
+                right_low = index
+
+            if node.left_child is not None and low < index:
+                stack.append((node.left_child, low, index))
+            if node.right_child is not None and right_low < high:
+                stack.append((node.right_child, right_low, high))
+
+        return [key in found for key in keys]
+
+
+class AVLTreeNode(BinaryTreeNode):
+    """
+    Self-balancing (AVL) implementation of a binary tree node.
+    Every node keeps the height of its subtree, and the heights of the
+    left and right subtrees never differ by more than one. Rotations are
+    applied on insert and delete, so the height stays O(log n) whatever
+    the insertion order is.
+    Rotations swap the contents of the nodes instead of the nodes
+    themselves. So, the root node never changes and the same
+    insert/search/traversal API of BinaryTreeNode can be used.
+    Nodes are also augmented with the size of their subtree, which answers
+    order-statistic queries (rank, select, count_range) in O(log n).
+    """
+
+    __slots__ = ('height', 'size')
+
+    def __init__(self, data) -> None:
+        super().__init__(data)
+        # Height of the subtree rooted at this node
+        self.height = 1
+        # Number of nodes of the subtree rooted at this node
+        self.size = 1
+
+    def __len__(self) -> int:
+        """ Number of values in the tree """
+        return self.size if self.data is not None else 0
+
+    def _is_empty(self) -> bool:
+        """ The root of an empty tree has no data """
+        return self.data is None
+
+    def __bool__(self) -> bool:
+        """ Nodes are always true, even the root of an empty tree """
+        return True
+
+    def rank(self, data) -> int:
+        """ Number of values smaller than data """
+        return self._count_smaller(data, False)
+
+    def select(self, index: int):
+        """ Returns the index-th smallest value (0 based) """
+        if not 0 <= index < len(self):
+            raise IndexError(f"Index {index} out of range!")
+
+        node = self
+        while True:
+            left_size = self._size(node.left_child)
+
+            if index < left_size:
+                node = node.left_child
+            elif index == left_size:
+                return node.data
+            else:
+                index -= left_size + 1
+                node = node.right_child
+
+    def count_range(self, low, high) -> int:
+        """ Number of values between low and high (both included) """
+        if high < low:
+            return 0
+
+        return self._count_smaller(high, True) - self._count_smaller(low, False)
+
+    def _count_smaller(self, data, inclusive: bool) -> int:
+        """ Number of values smaller than (or equal to, if inclusive) data """
+        if self.data is None:
+            return 0
+
+        count = 0
+        node = self
+        while node is not None:
+            if node.data < data or (inclusive and node.data == data):
+                # The node and its whole left subtree are counted
+                count += self._size(node.left_child) + 1
+                node = node.right_child
+            else:
+                node = node.left_child
+
+        return count
+
+    def insert(self, data):
+        """
+        Creates a new node with the given value, as BinaryTreeNode does,
+        and rebalances every node on the way back to the root.
+        """
+        if self.data is None:
+            self.data = data
+            return
+
+        if data < self.data:
+            if self.left_child is None:
+                self.left_child = type(self)(data)
+            else:
+                self.left_child.insert(data)
+        elif data > self.data:
+            if self.right_child is None:
+                self.right_child = type(self)(data)
+            else:
+                self.right_child.insert(data)
+        else:
+            # Duplicated values are ignored
+            return
+
+        self._rebalance()
+
+    def delete(self, data):
+        """ Removes the node with the given value, if it exists """
+        if self.data is None:
+            return
+
+        replacement = self._delete(data)
+
+        if replacement is None:
+            # The tree is empty now
+            self.data = None
+        elif replacement is not self:
+            # The root had a single child, which takes its place
+            self.data = replacement.data
+            self.left_child = replacement.left_child
+            self.right_child = replacement.right_child
+            self._update()
+
+    def _delete(self, data):
+        """
+        Auxiliary function to do the recursive work of delete.
+        Returns the node which takes the place of this one in its parent.
+        """
+        if data < self.data:
+            if self.left_child is not None:
+                self.left_child = self.left_child._delete(data)
+        elif data > self.data:
+            if self.right_child is not None:
+                self.right_child = self.right_child._delete(data)
+        else:
+            if self.left_child is None:
+                return self.right_child
+            if self.right_child is None:
+                return self.left_child
+
+            # With two children, the node takes the value of its successor
+            successor = self.right_child
+            while successor.left_child is not None:
+                successor = successor.left_child
+
+            self.data = successor.data
+            self.right_child = self.right_child._delete(successor.data)
+
+        self._rebalance()
+        return self
+
+    @staticmethod
+    def _height(node) -> int:
+        """ Height of a subtree, 0 for an empty one """
+        return node.height if node is not None else 0
+
+    @staticmethod
+    def _size(node) -> int:
+        """ Size of a subtree, 0 for an empty one """
+        return node.size if node is not None else 0
+
+    def _update(self) -> None:
+        """ Updates the height and the size of the node from its children """
+        self.height = 1 + max(self._height(self.left_child),
+                              self._height(self.right_child))
+        self.size = 1 + self._size(self.left_child) + self._size(self.right_child)
+
+    def _balance(self) -> int:
+        """ Difference between the heights of the left and right subtrees """
+        return self._height(self.left_child) - self._height(self.right_child)
+
+    def _rebalance(self) -> None:
+        """ Restores the AVL property of the node with one or two rotations """
+        self._update()
+        balance = self._balance()
+
+        if balance > 1:
+            # Left-Right case is turned into the Left-Left case
+            if self.left_child._balance() < 0:
+                self.left_child._rotate_left()
+            self._rotate_right()
+        elif balance < -1:
+            # Right-Left case is turned into the Right-Right case
+            if self.right_child._balance() > 0:
+                self.right_child._rotate_right()
+            self._rotate_left()
+
+    def _rotate_right(self) -> None:
+        """
+        Right rotation keeping this node as the subtree root:
+        (a (b x y) z) -> (b x (a y z))
+        """
+        pivot = self.left_child
+        self.data, pivot.data = pivot.data, self.data
+
+        self.left_child = pivot.left_child
+        pivot.left_child = pivot.right_child
+        pivot.right_child = self.right_child
+        self.right_child = pivot
+
+        pivot._update()
+        self._update()
+
+    def _rotate_left(self) -> None:
+        """
+        Left rotation keeping this node as the subtree root:
+        (a x (b y z)) -> (b (a x y) z)
+        """
+        pivot = self.right_child
+        self.data, pivot.data = pivot.data, self.data
+
+        self.right_child = pivot.right_child
+        pivot.right_child = pivot.left_child
+        pivot.left_child = self.left_child
+        self.left_child = pivot
+
+        pivot._update()
+        self._update()
+
+
+class PersistentTreeNode(BinaryTreeNode):
+    """
+    Persistent (immutable) AVL tree node.
+    insert does not modify the tree: it copies the path from the root to
+    the new node and returns a new root, which shares every untouched
+    subtree with the previous version. A reader holding a root has an
+    immutable snapshot, so readers never need a lock while a writer keeps
+    publishing new roots (assigning a reference is atomic).
+    Nodes must not be modified once they are part of a tree.
+    """
+
+    __slots__ = ('height',)
+
+    def __init__(self, data, left_child: Self = None, right_child: Self = None) -> None:
+        super().__init__(data)
+        self.left_child = left_child
+        self.right_child = right_child
+        self._update()
+
+    def _is_empty(self) -> bool:
+        """ The root of an empty tree has no data """
+        return self.data is None
+
+    def insert(self, data) -> Self:
+        """ Returns the root of a new version of the tree including data """
+        if self.data is None:
+            return type(self)(data)
+
+        return self._insert(self, data)
+
+    @classmethod
+    def _insert(cls, node: Self, data) -> Self:
+        """ Auxiliary function to copy the path of the new node """
+        if node is None:
+            return cls(data)
+
+        if data < node.data:
+            left_child = cls._insert(node.left_child, data)
+            if left_child is node.left_child:
+                return node
+            return cls._balanced(node.data, left_child, node.right_child)
+
+        if data > node.data:
+            right_child = cls._insert(node.right_child, data)
+            if right_child is node.right_child:
+                return node
+            return cls._balanced(node.data, node.left_child, right_child)
+
+        # Duplicated values are ignored, the whole tree is shared
+        return node
+
+    @staticmethod
+    def _height(node) -> int:
+        """ Height of a subtree, 0 for an empty one """
+        return node.height if node is not None else 0
+
+    def _update(self) -> None:
+        """ Updates the height of the node from its children """
+        self.height = 1 + max(self._height(self.left_child),
+                              self._height(self.right_child))
+
+    @classmethod
+    def _balanced(cls, data, left_child: Self, right_child: Self) -> Self:
+        """ Creates a node, with new rotated nodes if it is not balanced """
+        balance = cls._height(left_child) - cls._height(right_child)
+
+        if balance > 1:
+            if cls._height(left_child.left_child) < cls._height(left_child.right_child):
+                # Left-Right case is turned into the Left-Left case
+                pivot = left_child.right_child
+                left_child = cls(pivot.data,
+                                 cls(left_child.data, left_child.left_child, pivot.left_child),
+                                 pivot.right_child)
+            # Right rotation: (a (b x y) z) -> (b x (a y z))
+            return cls(left_child.data, left_child.left_child,
+                       cls(data, left_child.right_child, right_child))
+
+        if balance < -1:
+            if cls._height(right_child.right_child) < cls._height(right_child.left_child):
+                # Right-Left case is turned into the Right-Right case
+                pivot = right_child.left_child
+                right_child = cls(pivot.data, pivot.left_child,
+                                  cls(right_child.data, pivot.right_child, right_child.right_child))
+            # Left rotation: (a x (b y z)) -> (b (a x y) z)
+            return cls(right_child.data,
+                       cls(data, left_child, right_child.left_child),
+                       right_child.right_child)
+
+        return cls(data, left_child, right_child)
+
+
+class CompactBinaryTree:
+    """
+    Array-backed implementation of a binary tree, with the same API as
+    BinaryTreeNode. Instead of one object per node, nodes are rows of
+    parallel columns: the left child index, the right child index and
+    the key. Child indexes are stored in array.array columns (-1 means
+    no child). Keys are stored in an array.array when a typecode is given,
+    or in a list for any other kind of value. The root is row 0.
+    """
+
+    # Child index meaning there is no child
+    NO_CHILD = -1
+
+    def __init__(self, data=None, typecode: str = None) -> None:
+        # Key column
+        self._keys = array(typecode) if typecode is not None else []
+        # Child index columns
+        self._left = array('q')
+        self._right = array('q')
+
+        if data is not None:
+            self.insert(data)
+
+    def __len__(self) -> int:
+        """ Number of nodes """
+        return len(self._keys)
+
+    def __iter__(self) -> Iterator:
+        """ Values iterator, in order """
+        return self.iter_in_order()
+
+    def __str__(self) -> str:
+        """" String representation of the tree """
+        return str(self.data)
+
+    def __repr__(self) -> str:
+        """ Readable representation of the tree """
+        return str(self.data)
+
+    @property
+    def data(self):
+        """ Root value, None for an empty tree """
+        return self._keys[0] if self._keys else None
+
+    def _new_node(self, data) -> int:
+        """ Appends a new row and returns its index """
+        self._keys.append(data)
+        self._left.append(self.NO_CHILD)
+        self._right.append(self.NO_CHILD)
+        return len(self._keys) - 1
+
+    def insert(self, data):
+        """ Creates a new node with the given value, duplicates are ignored """
+        if not self._keys:
+            self._new_node(data)
+            return
+
+        keys = self._keys
+        index = 0
+        while True:
+            if data < keys[index]:
+                column = self._left
+            elif data > keys[index]:
+                column = self._right
+            else:
+                return
+
+            if column[index] == self.NO_CHILD:
+                column[index] = self._new_node(data)
+                return
+
+            index = column[index]
+
+    def search(self, root: Self, data) -> bool:
+        """ Search data in the binary tree """
+        if root is None:
+            return False
+
+        keys = root._keys
+        index = 0 if keys else self.NO_CHILD
+        while index != self.NO_CHILD:
+            if keys[index] == data:
+                return True
+
+            index = root._left[index] if data < keys[index] else root._right[index]
+
+        return False
+
+    def iter_in_order(self) -> Iterator:
+        """ Lazy traversal order: Left->Root->Right """
+        (keys, left, right) = (self._keys, self._left, self._right)
+        stack = []
+        index = 0 if keys else self.NO_CHILD
+
+        while stack or index != self.NO_CHILD:
+            while index != self.NO_CHILD:
+                stack.append(index)
+                index = left[index]
+
+            index = stack.pop()
+            yield keys[index]
+            index = right[index]
+
+    def iter_pre_order(self) -> Iterator:
+        """ Lazy traversal pre-order: Root->Left->Right """
+        (keys, left, right) = (self._keys, self._left, self._right)
+        stack = [0] if keys else []
+
+        while stack:
+            index = stack.pop()
+            yield keys[index]
+
+            if right[index] != self.NO_CHILD:
+                stack.append(right[index])
+            if left[index] != self.NO_CHILD:
+                stack.append(left[index])
+
+    def iter_post_order(self) -> Iterator:
+        """ Lazy traversal post-order: Left->Right->Root """
+        (keys, left, right) = (self._keys, self._left, self._right)
+        stack = []
+        index = 0 if keys else self.NO_CHILD
+        last_visited = self.NO_CHILD
+
+        while stack or index != self.NO_CHILD:
+            if index != self.NO_CHILD:
+                stack.append(index)
+                index = left[index]
+                continue
+
+            top = stack[-1]
+            # Visit the right subtree before the node, if not done yet
+            if right[top] != self.NO_CHILD and right[top] != last_visited:
+                index = right[top]
+            else:
+                yield keys[top]
+                last_visited = stack.pop()
+
+    def in_order_traversal(self, root: Self) -> List:
+        """ Traversal order: Left->Root->Right """
+        return list(root.iter_in_order()) if root is not None else []
+
+    def pre_order_traversal(self, root: Self) -> List:
+        """ Traversal pre-order: Root->Left->Right """
+        return list(root.iter_pre_order()) if root is not None else []
+
+    def post_order_traversal(self, root: Self) -> List:
+        """ Traversal post-order: Left->Right->Root """
+        return list(root.iter_post_order()) if root is not None else []
+
 
 def print_btree(root): # pragma: no cover
     """ Generic B-tree test printing """
@@ -162,10 +855,133 @@ def print_tree_names(): # pragma: no cover
     print_btree(root)
 
 
+def print_balanced_tree(): # pragma: no cover
+    """ Printing a balanced tree built from increasing values """
+    root = AVLTreeNode(1)
+    for value in range(2, 16):
+        root.insert(value)
+
+    print(f'Balanced tree of 15 increasing values, height: {root.height}')
+    print_btree(root)
+
+
+def benchmark_memory(size: int = 100000): # pragma: no cover
+    """ Compares the bytes per node of every storage mode """
+
+    class LegacyTreeNode:
+        """ Node with a __dict__, as BinaryTreeNode used to be """
+
+        def __init__(self, data) -> None:
+            self.data = data
+            self.right_child = None
+            self.left_child = None
+
+    def legacy_tree(values):
+        # Only the node objects are measured, the shape does not matter
+        return [LegacyTreeNode(value) for value in values]
+
+    def node_tree(cls, values):
+        root = cls(values[0])
+        for value in values[1:]:
+            root.insert(value)
+        return root
+
+    def compact_tree(typecode, values):
+        root = CompactBinaryTree(typecode=typecode)
+        for value in values:
+            root.insert(value)
+        return root
+
+    # Keys are created before tracing, so only the tree structure is measured
+    values = list(range(size))
+    random.Random(size).shuffle(values)
+    modes = [
+        ('dict nodes', lambda: legacy_tree(values)),
+        ('__slots__ nodes', lambda: node_tree(BinaryTreeNode, values)),
+        ('AVL nodes', lambda: node_tree(AVLTreeNode, values)),
+        ('compact, list keys', lambda: compact_tree(None, values)),
+        ("compact, 'q' keys", lambda: compact_tree('q', values)),
+    ]
+
+    print(f'{"mode":>20} {"bytes per node":>15}')
+    for (name, build) in modes:
+        tracemalloc.start()
+        tree = build()
+        (current, _) = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        del tree
+
+        print(f'{name:>20} {current / size:>15.1f}')
+
+
+def benchmark_concurrent_readers(readers: int = 4, size: int = 20000): # pragma: no cover
+    """
+    Compares the reads done while a writer inserts size values, for a
+    BinaryTreeNode guarded by a global lock and for lock-free readers of
+    a PersistentTreeNode.
+    """
+    values = list(range(1, size + 1))
+    random.Random(size).shuffle(values)
+
+    def run(write, read):
+        done = threading.Event()
+        reads = [0] * readers
+
+        def reader(number):
+            rand = random.Random(number)
+            while not done.is_set():
+                read(rand.randint(1, size))
+                reads[number] += 1
+
+        threads = [threading.Thread(target=reader, args=(number,)) for number in range(readers)]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+
+        for value in values:
+            write(value)
+
+        elapsed = time.perf_counter() - start
+        done.set()
+        for thread in threads:
+            thread.join()
+
+        return (elapsed, sum(reads))
+
+    lock = threading.Lock()
+    locked_root = BinaryTreeNode(None)
+
+    def locked_write(value):
+        with lock:
+            locked_root.insert(value)
+
+    def locked_read(value):
+        with lock:
+            return locked_root.search(locked_root, value)
+
+    snapshot = {'root': PersistentTreeNode(None)}
+
+    def persistent_write(value):
+        snapshot['root'] = snapshot['root'].insert(value)
+
+    def persistent_read(value):
+        root = snapshot['root']
+        return root.search(root, value)
+
+    print(f'{"tree":>12} {"writer (s)":>11} {"reads":>10} {"reads/s":>10}')
+    for (name, write, read) in (('locked', locked_write, locked_read),
+                                ('persistent', persistent_write, persistent_read)):
+        (elapsed, reads) = run(write, read)
+        print(f'{name:>12} {elapsed:>11.3f} {reads:>10} {reads / elapsed:>10.0f}')
+
+
 def main():
     """ Main method """
     print_tree_numbers()
     print_tree_names()
+    print_balanced_tree()
+    benchmark_memory()
+    benchmark_concurrent_readers()
 
 
 # main execution
@@ -10,7 +10,33 @@ __version__ = "1.0"
 __maintainer__ = "Marco Espinosa"
 __email__ = "hi@marcoespinosa.es"
 __status__ = "Development"
-__name__ = "Custom_Linked_List"
+
+from operator import attrgetter
+from typing import Iterable, Iterator, TextIO
+import queue
+import random
+import threading
+import time
+import timeit
+import tracemalloc
+
+# Default number of nodes rendered in each string chunk
+REPR_CHUNK_SIZE = 1024
+
+# Default number of values held by a node of an unrolled linked list
+UNROLLED_CAPACITY = 64
+
+# Default probability of a skip list node to reach the next level
+SKIP_LIST_PROBABILITY = 0.5
+
+# Default maximum number of levels of a skip list
+SKIP_LIST_MAX_LEVEL = 32
+
+# Gap between the labels of consecutive nodes of an indexed list
+LABEL_GAP = 1 << 32
+
+# Minimum gap between the labels of a crowded range of nodes once spread
+LABEL_MIN_GAP = 1 << 16
 
 
 class NodeNotFoundException(BaseException):
@@ -53,36 +79,399 @@ class Node:
         self._next = value
 
 
-class CustomLinkedList:
-    """ Class to implement a custom linked list """
+class DoublyNode(Node):
+    """ Class to handle doubly linked node implementation """
 
-    def __init__(self, nodes: list = None) -> None:
+    def __init__(self, data: object) -> None:
         """
         Default constructor.
-        param nodes: list of data objects for creating nodes.
+        param data: data value to assign to the current node. """
+
+        super().__init__(data)
+        self._prev = None
+
+    @property
+    def prev(self):
+        """ prev getter accessor """
+        return self._prev
+
+    @prev.setter
+    def prev(self, value) -> None:
+        """ prev setter accessor """
+        self._prev = value
+
+
+class IndexedNode(DoublyNode):
+    """ Class to handle indexed linked node implementation.
+    Labels increase along the list, and nodes with the same data value
+    are linked together in list order """
+
+    def __init__(self, data: object) -> None:
         """
+        Default constructor.
+        param data: data value to assign to the current node. """
+
+        super().__init__(data)
+        self._label = 0
+        self._entry = None
+        self._prev_same = None
+        self._next_same = None
+
+
+class CustomLinkedList:
+    """
+    Class to implement a custom linked list.
+    The list keeps a pointer to the tail and its size, so appending and
+    len() are O(1). In doubly linked mode, nodes also point to the
+    previous node, so pop_last and reverse iteration are O(1) per node
+    and the list can be used as a queue from both ends.
+    In indexed mode, a hash index maps every data value to the first and
+    the last of its nodes, which are linked together in list order, so
+    add_after, add_before, remove and the in operator do not scan the
+    list. The indexed mode implies the doubly linked mode, to find the
+    previous node in O(1). With duplicated values, the first node in the
+    list is targeted, as without the index. Nodes are labelled with
+    increasing numbers (crowded labels are spread again when needed), so
+    a new node goes to its place among the nodes with the same value in
+    O(1) when it is linked before or after all of them. Otherwise, it
+    takes as many steps as the nearest of them in the list, or as their
+    number. Data values must be hashable and nodes data must not be
+    modified directly in this mode.
+    """
+
+    def __init__(self, nodes: Iterable = None, doubly: bool = False, indexed: bool = False) -> None:
+        """
+        Default constructor.
+        param nodes: iterable (list, generator...) of data objects for creating nodes.
+        It is consumed in a single pass and it is not modified.
+        param doubly: whether nodes are linked to the previous node too.
+        param indexed: whether a data value to nodes index is kept (it implies doubly).
+        """
+        self.head = None
+        self.tail = None
+        self._size = 0
+        self._node_class = IndexedNode if indexed else DoublyNode if doubly else Node
+        # Data values to the first and the last of their nodes
+        self._index = {} if indexed else None
+
         if nodes is not None:
-            # Set the first node to the head list
-            node = Node(nodes.pop(0))
-            self.head = node
+            self.extend(nodes)
+
+    def __len__(self) -> int:
+        """ Number of nodes """
+        return self._size
+
+    def extend(self, nodes: Iterable) -> None:
+        """
+        Adds a node at the end for each data object of an iterable.
+        Nodes are linked in a tight loop, in a single pass over the iterable.
+        param nodes: iterable of data objects for creating nodes.
+        """
+        node_class = self._node_class
+        doubly = self.doubly
+        index = self._index
+        tail = self.tail
+        count = 0
 
-            # For the rest of nodes, create node an link to the next
+        try:
             for elem in nodes:
-                node.next = Node(elem)
-                node = node.next
+                node = node_class(elem)
+
+                # Index the node first, an unhashable value must not leave it linked
+                if index is not None:
+                    node._label = 0 if tail is None else tail._label + LABEL_GAP
+                    self._index_last(node)
+                if tail is None:
+                    self.head = node
+                else:
+                    tail._next = node
+                if doubly:
+                    node._prev = tail
+
+                tail = node
+                count += 1
+        finally:
+            # Keep the list consistent even if the iterable raised an error
+            self.tail = tail
+            self._size += count
+
+    @property
+    def doubly(self) -> bool:
+        """ Whether nodes are linked to the previous node """
+        return issubclass(self._node_class, DoublyNode)
+
+    @property
+    def indexed(self) -> bool:
+        """ Whether a data value to nodes index is kept """
+        return self._index is not None
+
+    def __getstate__(self) -> dict:
+        """
+        Pickles the list flattened into its data values, so long lists
+        do not reach the recursion limit of pickle through the nodes.
+        """
+        return {'nodes': [node.data for node in self],
+                'doubly': self.doubly, 'indexed': self.indexed}
+
+    def __setstate__(self, state: dict) -> None:
+        """ Rebuilds the list from the flattened state """
+        self.__init__(state['nodes'], doubly=state['doubly'], indexed=state['indexed'])
+
+    def _link_after(self, previous_node, node) -> None:
+        """
+        Auxiliary function to link a node after previous_node,
+        or at the beginning if previous_node is None.
+        """
+        entry = None
+        if self._index is not None:
+            # Look the value up first, an unhashable value must not leave the node linked
+            entry = self._index.get(node.data)
+
+        if previous_node is None:
+            node.next = self.head
+            self.head = node
+        else:
+            node.next = previous_node.next
+            previous_node.next = node
+
+        if self.doubly:
+            node.prev = previous_node
+            if node.next is not None:
+                node.next.prev = node
+
+        if node.next is None:
+            self.tail = node
+
+        if self._index is not None:
+            self._label_node(node)
+            self._index_node(node, entry)
+
+        self._size += 1
+
+    def _label_node(self, node) -> None:
+        """
+        Auxiliary function to label a node linked in an indexed list,
+        between the labels of its neighbours.
+        """
+        (previous_node, next_node) = (node.prev, node.next)
+        if previous_node is None:
+            node._label = 0 if next_node is None else next_node._label - LABEL_GAP
+        elif next_node is None:
+            node._label = previous_node._label + LABEL_GAP
+        else:
+            node._label = (previous_node._label + next_node._label) // 2
+            if node._label == previous_node._label:
+                self._relabel(node)
+
+    @staticmethod
+    def _relabel(node) -> None:
+        """
+        Auxiliary function to spread the labels around a node without room
+        between its neighbours. The range of relabelled nodes doubles until
+        their labels can be LABEL_MIN_GAP apart, or it reaches an end of the
+        list, where labels can grow (or decrease) freely.
+        """
+        (first, last, count) = (node, node, 1)
+        while True:
+            for _ in range(count):
+                if first.prev is not None:
+                    (first, count) = (first.prev, count + 1)
+                if last.next is not None:
+                    (last, count) = (last.next, count + 1)
+
+            if first.prev is None or last.next is None:
+                gap = LABEL_GAP
+                if first.prev is not None:
+                    label = first.prev._label + gap
+                else:
+                    label = 0 if last.next is None else last.next._label - count * gap
+                break
+
+            gap = (last.next._label - first.prev._label) // (count + 1)
+            if gap >= LABEL_MIN_GAP:
+                label = first.prev._label + gap
+                break
+
+        for _ in range(count):
+            first._label = label
+            (first, label) = (first.next, label + gap)
+
+    def _index_last(self, node) -> None:
+        """
+        Auxiliary function to index a node being linked at the end,
+        after every other node with the same value.
+        """
+        entry = self._index.get(node.data)
+        if entry is None:
+            entry = self._index[node.data] = [node, node]
+        else:
+            self._chain_after(entry, entry[1], node)
+        node._entry = entry
+
+    def _index_node(self, node, entry) -> None:
+        """
+        Auxiliary function to index a node linked anywhere, in its place
+        among the nodes with the same value by their labels.
+        param entry: first and last nodes with the same value, or None.
+        """
+        if entry is None:
+            entry = self._index[node.data] = [node, node]
+        else:
+            (first, last) = entry
+            if node._label > last._label:
+                self._chain_after(entry, last, node)
+            elif node._label < first._label:
+                self._chain_after(entry, None, node)
+            else:
+                self._chain_after(entry, self._previous_same(node, entry), node)
+        node._entry = entry
+
+    @staticmethod
+    def _previous_same(node, entry):
+        """
+        Auxiliary function to get the node before node among the nodes with
+        the same value, when there are such nodes before and after it.
+        The list is walked from node and the nodes with the same value from
+        both ends, step by step, until any walk finds the place of node.
+        """
+        (first, last) = entry
+        (backward, forward, label) = (node, node, node._label)
+        while True:
+            backward = backward.prev
+            if backward._entry is entry:
+                return backward
+
+            forward = forward.next
+            if forward._entry is entry:
+                return forward._prev_same
+
+            last = last._prev_same
+            if last._label < label:
+                return last
+
+            if first._next_same._label > label:
+                return first
+            first = first._next_same
+
+    @staticmethod
+    def _chain_after(entry, previous_same, node) -> None:
+        """
+        Auxiliary function to link a node after previous_same among the
+        nodes with the same value, or first if previous_same is None.
+        """
+        next_same = entry[0] if previous_same is None else previous_same._next_same
+        (node._prev_same, node._next_same) = (previous_same, next_same)
+
+        if previous_same is None:
+            entry[0] = node
+        else:
+            previous_same._next_same = node
+
+        if next_same is None:
+            entry[1] = node
+        else:
+            next_same._prev_same = node
+
+    def _unchain(self, node) -> None:
+        """
+        Auxiliary function to unlink a node from the nodes with the same
+        value, dropping the value from the index after its last node.
+        """
+        (entry, previous_same, next_same) = (node._entry, node._prev_same, node._next_same)
+
+        if previous_same is None:
+            entry[0] = next_same
+        else:
+            previous_same._next_same = next_same
+
+        if next_same is None:
+            entry[1] = previous_same
+        else:
+            next_same._prev_same = previous_same
+
+        if previous_same is None and next_same is None:
+            del self._index[node.data]
+
+        node._entry = node._prev_same = node._next_same = None
+
+    def _unlink(self, previous_node, node) -> None:
+        """
+        Auxiliary function to unlink a node,
+        previous_node being the node before it (None for the head).
+        """
+        if previous_node is None:
+            self.head = node.next
+        else:
+            previous_node.next = node.next
+
+        if self.doubly and node.next is not None:
+            node.next.prev = previous_node
+
+        if node is self.tail:
+            self.tail = previous_node
+
+        node.next = None
+        if self.doubly:
+            node.prev = None
+
+        if self._index is not None:
+            self._unchain(node)
+
+        self._size -= 1
+
+    def _relink(self) -> None:
+        """
+        Auxiliary function to restore the tail, the size (previous
+        pointers, labels and the index) after the nodes were relinked,
+        as sort does.
+        """
+        previous_node = None
+        size = 0
+        if self._index is not None:
+            self._index.clear()
+        for node in self:
+            if self.doubly:
+                node.prev = previous_node
+            if self._index is not None:
+                # Drop the links between nodes with the same value in the previous order
+                (node._label, node._prev_same, node._next_same) = (size * LABEL_GAP, None, None)
+                self._index_last(node)
+            previous_node = node
+            size += 1
+
+        self.tail = previous_node
+        self._size = size
 
     def __repr__(self) -> str:
         """ String representation for the CustomLinkedList class """
-        node = self.head
-        nodes = []
+        return "".join(self.iter_repr())
 
-        while node is not None:
-            nodes.append(node.data)
-            node = node.next
+    def iter_repr(self, chunk_size: int = REPR_CHUNK_SIZE) -> Iterator[str]:
+        """
+        Renders the string representation incrementally.
+        param chunk_size: number of nodes rendered in each string chunk.
+        """
+        chunk = []
+        for node in self:
+            chunk.append(str(node.data))
 
-        nodes.append("None")
+            if len(chunk) == chunk_size:
+                chunk.append("")
+                yield " -> ".join(chunk)
+                chunk = []
 
-        return " -> ".join(nodes)
+        chunk.append("None")
+        yield " -> ".join(chunk)
+
+    def write_to(self, stream: TextIO, chunk_size: int = REPR_CHUNK_SIZE) -> None:
+        """
+        Writes the string representation to a text stream,
+        with bounded memory.
+        param stream: text stream, like a file or sys.stdout.
+        param chunk_size: number of nodes rendered in each write.
+        """
+        for chunk in self.iter_repr(chunk_size):
+            stream.write(chunk)
 
     def __iter__(self) -> Node:
         """ Node iterator """
@@ -91,6 +480,18 @@ class CustomLinkedList:
             yield node
             node = node.next
 
+    def __reversed__(self) -> Node:
+        """ Reverse node iterator """
+        if not self.doubly:
+            # Singly linked nodes can only be reversed through a copy
+            yield from reversed(list(self))
+            return
+
+        node = self.tail
+        while node is not None:
+            yield node
+            node = node.prev
+
     def add_first(self, data: object) -> None:
         """
         Adds new node with data value at the beginning.
@@ -98,13 +499,7 @@ class CustomLinkedList:
         """
 
         if data is not None:
-            node = Node(data=data)
-
-            if self.head is not None:
-                node.next = self.head
-                self.head = node
-            else:
-                self.head = node
+            self._link_after(None, self._node_class(data=data))
 
     def add_last(self, data: object) -> None:
         """
@@ -112,15 +507,73 @@ class CustomLinkedList:
         param data: data object for the new node.
         """
         if data is not None:
-            node = Node(data=data)
+            self._link_after(self.tail, self._node_class(data=data))
+
+    def pop_first(self) -> object:
+        """ Removes the first node and returns its data """
+        if self.head is None:
+            raise IndexError("pop from empty list")
+
+        node = self.head
+        self._unlink(None, node)
+        return node.data
+
+    def pop_last(self) -> object:
+        """
+        Removes the last node and returns its data.
+        It is O(1) in doubly linked mode, O(n) otherwise.
+        """
+        if self.tail is None:
+            raise IndexError("pop from empty list")
+
+        node = self.tail
+        self._unlink(self._previous(node), node)
+        return node.data
 
-            # Set pointer to the last node
+    def __contains__(self, data: object) -> bool:
+        """ Checks whether a node has the data value """
+        if self._index is not None:
+            return data in self._index
+
+        return any(node.data == data for node in self)
+
+    def _find(self, targeted_data: object):
+        """
+        Auxiliary function to find the node with targeted_data value.
+        Returns the node before it (None for the head) and the node.
+        """
+        if self._index is not None:
+            entry = self._index.get(targeted_data)
+            if entry is not None:
+                node = entry[0]
+                return (node.prev, node)
+        else:
+            previous_node = None
             for current_node in self:
-                pass
+                if current_node.data == targeted_data:
+                    return (previous_node, current_node)
 
-            # Set new last node
-            if current_node is not None:
-                current_node.next = node
+                previous_node = current_node
+
+        raise NodeNotFoundException(
+            f"Targeted data {targeted_data} doesn't found!")
+
+    def _previous(self, node):
+        """
+        Auxiliary function to get the node before node.
+        It is O(1) in doubly linked mode, O(n) otherwise.
+        """
+        if self.doubly:
+            return node.prev
+
+        if node is self.head:
+            return None
+
+        for current_node in self:
+            if current_node.next is node:
+                return current_node
+
+        return None
 
     def add_after(self, targeted_data: object, new_data: object) -> None:
         """
@@ -130,17 +583,8 @@ class CustomLinkedList:
         """
 
         if new_data is not None:
-            node = Node(data=new_data)
-
-            # Set pointer to the last node
-            for current_node in self:
-                if current_node.data == targeted_data:
-                    node.next = current_node.next
-                    current_node.next = node
-                    return
-
-            raise NodeNotFoundException(
-                f"Targeted data {targeted_data} doesn't found!")
+            (_, current_node) = self._find(targeted_data)
+            self._link_after(current_node, self._node_class(data=new_data))
 
     def add_before(self, targeted_data: object, new_data: object) -> None:
         """
@@ -150,58 +594,140 @@ class CustomLinkedList:
         """
 
         if new_data is not None:
-            node = Node(data=new_data)
-            previous_node = None
-
-            for current_node in self:
-                if previous_node is not None and \
-                        current_node.data == targeted_data:
-
-                    previous_node.next = node
-                    node.next = current_node
-                    return
+            (previous_node, _) = self._find(targeted_data)
+            self._link_after(previous_node, self._node_class(data=new_data))
 
-                previous_node = current_node
-
-            raise NodeNotFoundException(
-                f"Targeted data {targeted_data} doesn't found!")
+    def remove(self, data: object) -> None:
+        """
+        Removes the node with data value.
+        param data: data object of an existing node.
+        """
+        (previous_node, node) = self._find(data)
+        self._unlink(previous_node, node)
 
-    def sort(self):
+    def sort(self, key=None, reverse: bool = False):
         """
-        Method to sort the list ascendant
+        Method to sort the list ascendant (or descendant if reverse)
         NOTE: The best method is the merge sort algorithm.
-        Merge sort algorithm splits in two equal lists the original list.
-        Then, sorts each list individually. It sorts each list recursively,
-        by dividing again each least in two equal parts. So, every time the
-        the sort method is called, it is called with a smaller piece of list.
-        Finally, the two resultant lists have to be merged.
+        This is an iterative bottom-up natural merge sort. First, the list is
+        split in its natural runs (already ordered sequences of nodes). Then,
+        runs are merged in pairs, pass after pass, so their width doubles
+        every pass until a single run is left. Nodes are merged in place by
+        relinking them and there is no recursion. A nearly sorted list has
+        few runs, so it is sorted in close to O(n).
+        The sort is stable and the key of each node is computed only once.
+        If two keys can not be compared, a TypeError is raised and every
+        node is kept in the list, although it may be partially sorted.
+        param key: function computing the comparison key of each data value.
+        param reverse: whether to sort in descending order.
         """
 
         try:
-            self.head = self._sort(self.head)
+            self.head = self._sort(self.head, key, reverse)
         except Exception as error:
             raise TypeError("The list can not be sorted!") from error
+        finally:
+            self._relink()
 
-    def _sort(self, node) -> None:
+    def _sort(self, node, key=None, reverse: bool = False):
         """
-        Auxiliary function to do the recursive work.
+        Auxiliary function to do the iterative work.
         param node: the head of the list to be sorted.
         """
 
         if node is None or node.next is None:
             return node
 
-        # Get the middle node of the list beginning on node
-        middle_node = self.get_middle_node(node)
-        next_middle_node = middle_node.next
-        # Point the middle node to None, so it does split the list in two parts
-        middle_node.next = None
-        # Sort left and right parts of the list recursively
-        left_sorted_node = self._sort(node)
-        right_sorted_node = self._sort(next_middle_node)
+        key_of = self._key_function(node, key)
+        runs = self._natural_runs(node, key_of, reverse)
+
+        # Merge runs in pairs until there is a single one
+        while len(runs) > 1:
+            merged_runs = []
+            for i in range(0, len(runs) - 1, 2):
+                try:
+                    merged_runs.append(self._merge_two_lists(runs[i], runs[i + 1], key_of, reverse))
+                except Exception:
+                    # Link every run back, so no node is lost
+                    self.head = self._join_runs(merged_runs + [self._merged_head(runs[i], runs[i + 1])]
+                                                + runs[i + 2:])
+                    raise
+            if len(runs) % 2 == 1:
+                merged_runs.append(runs[-1])
+            runs = merged_runs
+
+        return runs[0]
+
+    @staticmethod
+    def _natural_runs(node, key_of, reverse: bool = False) -> list:
+        """
+        Auxiliary function to split the list beginning on node in its
+        natural runs. Returns the head of each run.
+        Runs are found first, so the list is left untouched if two keys
+        can not be compared.
+        param key_of: function to get the key of a node.
+        param reverse: whether runs are in descending order.
+        """
+        runs = []
+        last_nodes = []
+        while node is not None:
+            runs.append(node)
+
+            node_key = key_of(node)
+            while node.next is not None:
+                next_key = key_of(node.next)
+                if not ((next_key <= node_key) if reverse else (node_key <= next_key)):
+                    break
+                (node, node_key) = (node.next, next_key)
+
+            last_nodes.append(node)
+            node = node.next
+
+        # Point the last node of each run to None, so it does split the list
+        for node in last_nodes:
+            node.next = None
+
+        return runs
+
+    @staticmethod
+    def _merged_head(node_left, node_right):
+        """
+        Auxiliary function to get the head of two runs relinked together
+        by a failed merge: the one which is not reached from the other.
+        """
+        node = node_right
+        while node is not None:
+            if node is node_left:
+                return node_right
+            node = node.next
+
+        return node_left
+
+    @staticmethod
+    def _join_runs(runs):
+        """ Auxiliary function to link runs one after the other. Returns the head """
+        for (run, next_run) in zip(runs, runs[1:]):
+            while run.next is not None:
+                run = run.next
+            run.next = next_run
 
-        # Return the merged list
-        return self._merge_two_lists(left_sorted_node, right_sorted_node)
+        return runs[0]
+
+    @staticmethod
+    def _key_function(node, key=None):
+        """
+        Auxiliary function returning the function to get the key of a node.
+        Keys are computed once for every node beginning on node.
+        """
+        if key is None:
+            return attrgetter('_data')
+
+        keys = {}
+        while node is not None:
+            keys[node] = key(node.data)
+            node = node.next
+
+        return keys.__getitem__
 
     def get_middle_node(self, node):
         """
@@ -225,58 +751,719 @@ class CustomLinkedList:
 
         return slow_node
 
-    def _merge_two_lists(self, node_left, node_right):
+    def _merge_two_lists(self, node_left, node_right, key_of=None, reverse: bool = False):
         """
-        Auxiliary function to merge two lists
-        param a: node left
-        param b: node right
+        Auxiliary function to merge two sorted lists
+        param node_left: head of the left list
+        param node_right: head of the right list
+        param key_of: function to get the key of a node (default: its data)
+        param reverse: whether the lists are sorted in descending order
         """
 
-        if node_left is None:
-            return node_right
-
-        if node_right is None:
-            return node_left
+        if key_of is None:
+            key_of = self._key_function(None)
 
-        head_of_merged_list = None
-        temp_node_for_merged_list = None
-
-        # Selecting the header (Always checking in ascendant mode)
-        if node_left.data <= node_right.data:
-            head_of_merged_list = node_left
-            node_left = node_left.next
-        else:
-            head_of_merged_list = node_right
-            node_right = node_right.next
+        if node_left is None or node_right is None:
+            return node_left if node_left is not None else node_right
 
+        # Dummy node before the head of the merged list
+        head_of_merged_list = Node(None)
         temp_node_for_merged_list = head_of_merged_list
 
-        # Iterate through the two lists
-        while node_left is not None and node_right is not None:
+        # Keys are only fetched again for the node that moves forward
+        left_key = key_of(node_left)
+        right_key = key_of(node_right)
 
-            if node_left.data <= node_right.data:
-                temp_node_for_merged_list.next = node_left
-                node_left = node_left.next
+        # Iterate through the two lists, left nodes go first with equal keys
+        try:
+            while True:
+                if (right_key <= left_key) if reverse else (left_key <= right_key):
+                    temp_node_for_merged_list.next = node_left
+                    temp_node_for_merged_list = node_left
+                    node_left = node_left.next
+
+                    if node_left is None:
+                        # The remaining right nodes go to the end
+                        temp_node_for_merged_list.next = node_right
+                        break
+                    left_key = key_of(node_left)
+                else:
+                    temp_node_for_merged_list.next = node_right
+                    temp_node_for_merged_list = node_right
+                    node_right = node_right.next
+
+                    if node_right is None:
+                        # The remaining left nodes go to the end
+                        temp_node_for_merged_list.next = node_left
+                        break
+                    right_key = key_of(node_right)
+        except Exception:
+            # Keep the merged, the remaining left and the remaining right nodes linked
+            temp_node_for_merged_list.next = node_left
+            while temp_node_for_merged_list.next is not None:
                 temp_node_for_merged_list = temp_node_for_merged_list.next
-                temp_node_for_merged_list.next = None
+            temp_node_for_merged_list.next = node_right
+            raise
+
+        return head_of_merged_list.next
+
+
+class UnrolledNode:
+    """ Class to handle unrolled linked node implementation:
+    a node holding a small array of values """
+
+    __slots__ = ('values', 'next')
+
+    def __init__(self, values: list = None) -> None:
+        """
+        Default constructor.
+        param values: list of values of the node. """
+
+        self.values = values if values is not None else []
+        self.next = None
+
+    def __repr__(self) -> str:
+        """ String representation of a node """
+        return str(self.values)
+
+
+class UnrolledItem:
+    """ Class to handle a value of an unrolled linked node,
+    with the same data accessors as a linked node """
+
+    __slots__ = ('_node', '_position')
+
+    def __init__(self, node: UnrolledNode, position: int) -> None:
+        """
+        Default constructor.
+        param node: unrolled node holding the value.
+        param position: position of the value in the node. """
+
+        self._node = node
+        self._position = position
 
+    def __repr__(self) -> str:
+        """ String representation of a value """
+        return str(self.data)
+
+    @property
+    def data(self) -> object:
+        """ data getter accessor """
+        return self._node.values[self._position]
+
+    @data.setter
+    def data(self, value) -> None:
+        """ data setter accessor """
+        self._node.values[self._position] = value
+
+
+class UnrolledLinkedList:
+    """
+    Class to implement an unrolled linked list.
+    Each node stores up to capacity values in a small array, instead of a
+    single one. So, there are far fewer node objects to allocate and to
+    follow while iterating. A full node is split in two halves when a value
+    is inserted into it, and a node left less than half full by a removal
+    is merged with (or borrows values from) the next one.
+    It has the same API as CustomLinkedList: iterating yields an item with
+    the data accessors of a node for each value, and values() iterates
+    over the bare values, without creating the items.
+    """
+
+    def __init__(self, nodes: list = None, capacity: int = UNROLLED_CAPACITY) -> None:
+        """
+        Default constructor.
+        param nodes: list of data objects for creating nodes.
+        param capacity: maximum number of values per node.
+        """
+        if capacity < 2:
+            raise ValueError("The capacity of the nodes has to be at least 2!")
+
+        self.head = None
+        self.tail = None
+        self._size = 0
+        self._capacity = capacity
+
+        if nodes is not None:
+            for elem in nodes:
+                self._append(elem)
+
+    def __len__(self) -> int:
+        """ Number of values """
+        return self._size
+
+    def __getstate__(self) -> dict:
+        """ Pickles the list flattened into its values """
+        return {'nodes': list(self.values()), 'capacity': self._capacity}
+
+    def __setstate__(self, state: dict) -> None:
+        """ Rebuilds the list from the flattened state """
+        self.__init__(state['nodes'], capacity=state['capacity'])
+
+    def __repr__(self) -> str:
+        """ String representation for the UnrolledLinkedList class """
+        return " -> ".join([str(value) for value in self.values()] + ["None"])
+
+    def __iter__(self) -> UnrolledItem:
+        """ Node-like iterator, yielding an item for each value """
+        for node in self._nodes():
+            for position in range(len(node.values)):
+                yield UnrolledItem(node, position)
+
+    def values(self) -> Iterator:
+        """ Values iterator """
+        node = self.head
+        while node is not None:
+            yield from node.values
+            node = node.next
+
+    def __contains__(self, data: object) -> bool:
+        """ Checks whether a node has the data value """
+        return any(data in node.values for node in self._nodes())
+
+    def _nodes(self):
+        """ Auxiliary iterator of the nodes """
+        node = self.head
+        while node is not None:
+            yield node
+            node = node.next
+
+    def _append(self, data: object) -> None:
+        """ Auxiliary function to append a value, filling the tail node first """
+        if self.tail is None or len(self.tail.values) == self._capacity:
+            node = UnrolledNode()
+            if self.tail is None:
+                self.head = node
             else:
-                temp_node_for_merged_list.next = node_right
-                node_right = node_right.next
-                temp_node_for_merged_list = temp_node_for_merged_list.next
-                temp_node_for_merged_list.next = None
+                self.tail.next = node
+            self.tail = node
 
-        # if "b" ends then we assign all remain elements of "a" to end of "head_of_merged_list",
-        # if "a" ends then we assign all remain elements of "b" to end of "head_of_merged_list".
-        # and then returns the "head_of_merged_list".
+        self.tail.values.append(data)
+        self._size += 1
 
-        if node_left is not None:
-            temp_node_for_merged_list.next = node_left
+    def _find(self, targeted_data: object):
+        """
+        Auxiliary function to find the first value equal to targeted_data.
+        Returns the previous node, the node and the position in the node.
+        """
+        previous_node = None
+        for node in self._nodes():
+            for (position, value) in enumerate(node.values):
+                if value == targeted_data:
+                    return (previous_node, node, position)
 
-        if node_right is not None:
-            temp_node_for_merged_list.next = node_right
+            previous_node = node
+
+        raise NodeNotFoundException(
+            f"Targeted data {targeted_data} doesn't found!")
+
+    def _insert(self, node: UnrolledNode, position: int, data: object) -> None:
+        """ Auxiliary function to insert a value, splitting a full node """
+        if len(node.values) == self._capacity:
+            # Move the upper half to a new node
+            half = self._capacity // 2
+            new_node = UnrolledNode(node.values[half:])
+            del node.values[half:]
+
+            new_node.next = node.next
+            node.next = new_node
+            if node is self.tail:
+                self.tail = new_node
+
+            if position > half:
+                (node, position) = (new_node, position - half)
+
+        node.values.insert(position, data)
+        self._size += 1
+
+    def add_first(self, data: object) -> None:
+        """
+        Adds new value at the beginning.
+        param data: data object for the new value.
+        """
+        if data is not None:
+            if self.head is None:
+                self._append(data)
+            else:
+                self._insert(self.head, 0, data)
+
+    def add_last(self, data: object) -> None:
+        """
+        Adds new value at the end.
+        param data: data object for the new value.
+        """
+        if data is not None:
+            self._append(data)
+
+    def add_after(self, targeted_data: object, new_data: object) -> None:
+        """
+        Adds new value after the targeted_data value.
+        param targeted_data: data object of an existing value.
+        param new_data: data object for the new value.
+        """
+        if new_data is not None:
+            (_, node, position) = self._find(targeted_data)
+            self._insert(node, position + 1, new_data)
+
+    def add_before(self, targeted_data: object, new_data: object) -> None:
+        """
+        Adds new value before the targeted_data value.
+        param targeted_data: data object of an existing value.
+        param new_data: data object for the new value.
+        """
+        if new_data is not None:
+            (_, node, position) = self._find(targeted_data)
+            self._insert(node, position, new_data)
 
-        return head_of_merged_list
+    def remove(self, data: object) -> None:
+        """
+        Removes the first data value.
+        param data: data object of an existing value.
+        """
+        (previous_node, node, position) = self._find(data)
+        del node.values[position]
+        self._size -= 1
+
+        next_node = node.next
+        if len(node.values) < self._capacity // 2 and next_node is not None:
+            if len(node.values) + len(next_node.values) <= self._capacity:
+                # Merge the next node into this one
+                node.values.extend(next_node.values)
+                node.next = next_node.next
+                if next_node is self.tail:
+                    self.tail = node
+            else:
+                # Borrow values from the next node to balance both
+                count = (len(next_node.values) - len(node.values)) // 2
+                node.values.extend(next_node.values[:count])
+                del next_node.values[:count]
+
+        if not node.values:
+            # Only the tail can be left empty, as it has no next node
+            if previous_node is None:
+                self.head = node.next
+            else:
+                previous_node.next = node.next
+            if node is self.tail:
+                self.tail = previous_node
+
+    def sort(self) -> None:
+        """ Method to sort the list ascendant. Nodes are rebuilt full """
+        try:
+            values = sorted(self.values())
+        except Exception as error:
+            raise TypeError("The list can not be sorted!") from error
+
+        self.head = None
+        self.tail = None
+        self._size = 0
+        for value in values:
+            self._append(value)
+
+
+class SkipNode(Node):
+    """ Class to handle skip list node implementation:
+    a node with a forward pointer for each of its levels """
+
+    def __init__(self, data: object, level: int) -> None:
+        """
+        Default constructor.
+        param data: data value to assign to the current node.
+        param level: number of levels of the node. """
+
+        super().__init__(data)
+        self.forward = [None] * level
+
+    @property
+    def next(self):
+        """ next getter accessor, the forward pointer of the first level """
+        return self.forward[0]
+
+    @next.setter
+    def next(self, value) -> None:
+        """ next setter accessor """
+        self.forward[0] = value
+
+
+class SkipList:
+    """
+    Class to implement a sorted container as a skip list.
+    The first level is a sorted linked list of every node. Each node also
+    reaches the next level with some probability, and each level is a
+    linked list of the nodes reaching it. Searching starts at the top level
+    and goes down a level when the next node is too big, so insert, search
+    and remove are O(log n) expected. Values are kept in order on every
+    insert, so there is no need to sort the list.
+    As CustomLinkedList, it iterates over nodes with data and next.
+    """
+
+    def __init__(self, nodes: list = None, probability: float = SKIP_LIST_PROBABILITY,
+                 max_level: int = SKIP_LIST_MAX_LEVEL, seed=None) -> None:
+        """
+        Default constructor.
+        param nodes: list of data objects for creating nodes.
+        param probability: probability of a node to reach the next level.
+        Smaller values use less memory, but searches are longer.
+        param max_level: maximum number of levels.
+        param seed: seed of the random levels generator.
+        """
+        if not 0 < probability < 1:
+            raise ValueError("The probability has to be between 0 and 1!")
+        if max_level < 1:
+            raise ValueError("The maximum level has to be at least 1!")
+
+        self._probability = probability
+        self._max_level = max_level
+        self._random = random.Random(seed)
+        # Header node, before the first node of every level
+        self._header = SkipNode(None, max_level)
+        self._level = 1
+        self._size = 0
+
+        if nodes is not None:
+            for elem in nodes:
+                self.insert(elem)
+
+    def __len__(self) -> int:
+        """ Number of nodes """
+        return self._size
+
+    def __getstate__(self) -> dict:
+        """ Pickles the list flattened into its data values """
+        return {'nodes': [node.data for node in self], 'probability': self._probability,
+                'max_level': self._max_level, 'random': self._random}
+
+    def __setstate__(self, state: dict) -> None:
+        """ Rebuilds the list from the flattened state, drawing new levels """
+        self.__init__(probability=state['probability'], max_level=state['max_level'])
+        self._random = state['random']
+        for elem in state['nodes']:
+            self.insert(elem)
+
+    def __repr__(self) -> str:
+        """ String representation for the SkipList class """
+        return " -> ".join([str(node) for node in self] + ["None"])
+
+    def __iter__(self) -> SkipNode:
+        """ Node iterator, in order """
+        node = self.head
+        while node is not None:
+            yield node
+            node = node.next
+
+    def __contains__(self, data: object) -> bool:
+        """ Checks whether a node has the data value """
+        return self.search(data)
+
+    @property
+    def head(self) -> SkipNode:
+        """ First node """
+        return self._header.next
+
+    def sort(self) -> None:
+        """ Nothing to do, the skip list is always sorted """
+
+    def _random_level(self) -> int:
+        """ Auxiliary function to draw the number of levels of a new node """
+        level = 1
+        while level < self._max_level and self._random.random() < self._probability:
+            level += 1
+
+        return level
+
+    def _predecessors(self, data: object, inclusive: bool = False) -> list:
+        """
+        Auxiliary function to get, for each level, the last node with a
+        value smaller than (or equal to, if inclusive) data.
+        """
+        update = [self._header] * self._max_level
+        node = self._header
+
+        for level in range(self._level - 1, -1, -1):
+            while node.forward[level] is not None and \
+                    (node.forward[level].data < data or
+                     (inclusive and node.forward[level].data == data)):
+                node = node.forward[level]
+            update[level] = node
+
+        return update
+
+    def insert(self, data: object) -> None:
+        """
+        Adds new node with data value in its sorted place.
+        Equal values are inserted after the existing ones.
+        param data: data object for the new node.
+        """
+        if data is None:
+            return
+
+        update = self._predecessors(data, inclusive=True)
+        level = self._random_level()
+        self._level = max(self._level, level)
+
+        node = SkipNode(data, level)
+        for current_level in range(level):
+            node.forward[current_level] = update[current_level].forward[current_level]
+            update[current_level].forward[current_level] = node
+
+        self._size += 1
+
+    def search(self, data: object) -> bool:
+        """ Checks whether a node has the data value """
+        node = self._predecessors(data)[0].next
+        return node is not None and node.data == data
+
+    def remove(self, data: object) -> None:
+        """
+        Removes the first node with data value.
+        param data: data object of an existing node.
+        """
+        update = self._predecessors(data)
+        node = update[0].next
+
+        if node is None or node.data != data:
+            raise NodeNotFoundException(
+                f"Targeted data {data} doesn't found!")
+
+        for level in range(len(node.forward)):
+            update[level].forward[level] = node.forward[level]
+
+        # Drop the empty top levels
+        while self._level > 1 and self._header.forward[self._level - 1] is None:
+            self._level -= 1
+
+        self._size -= 1
+
+    def range(self, low: object, high: object) -> SkipNode:
+        """ Node iterator of the values between low and high (both included) """
+        node = self._predecessors(low)[0].next
+
+        while node is not None and not high < node.data:
+            yield node
+            node = node.next
+
+
+class ConcurrentLinkedList:
+    """
+    Class to implement a thread safe FIFO linked list, as the two-lock queue
+    of Michael and Scott. The head is always a dummy node, so producers only
+    change the tail while holding the put lock and consumers only change the
+    head while holding the take lock. Hence, add_last and pop_first can run
+    in parallel. The number of nodes is shared by both sides, so it has its
+    own small lock. An optional capacity bounds the list, and add_last then
+    waits for consumers to make room.
+    """
+
+    def __init__(self, nodes: Iterable = None, capacity: int = 0) -> None:
+        """
+        Default constructor.
+        param nodes: iterable with the initial values.
+        param capacity: maximum number of nodes, 0 for an unbounded list.
+        """
+        if capacity < 0:
+            raise ValueError("The capacity can not be negative!")
+
+        self.head = Node(data=None)
+        self.tail = self.head
+        self._capacity = capacity
+        self._size = 0
+        self._size_lock = threading.Lock()
+        self._put_lock = threading.Lock()
+        self._take_lock = threading.Lock()
+        self._not_full = threading.Condition(self._put_lock)
+        self._not_empty = threading.Condition(self._take_lock)
+
+        if nodes is not None:
+            for data in nodes:
+                self.add_last(data, block=False)
+
+    @property
+    def capacity(self) -> int:
+        """ capacity getter accessor """
+        return self._capacity
+
+    def __len__(self) -> int:
+        """ Returns the number of nodes """
+        return self._size
+
+    def _add_to_size(self, delta: int) -> int:
+        """ Adds delta to the number of nodes and returns the previous number """
+        with self._size_lock:
+            size = self._size
+            self._size = size + delta
+        return size
+
+    @staticmethod
+    def _wait(condition: threading.Condition, ready, block: bool, timeout: float) -> bool:
+        """
+        Waits on the (already held) condition until ready() is true.
+        Returns False if it is not ready when not blocking or after timeout.
+        """
+        if not block:
+            return False
+        if timeout is None:
+            while not ready():
+                condition.wait()
+            return True
+        if timeout < 0:
+            raise ValueError("The timeout can not be negative!")
+
+        deadline = time.monotonic() + timeout
+        while not ready():
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            condition.wait(remaining)
+        return True
+
+    def add_last(self, data: object, block: bool = True, timeout: float = None) -> None:
+        """
+        Adds new node with data value at the end.
+        param data: data object for the new node.
+        param block: whether to wait for room in a full list.
+        param timeout: maximum number of seconds to wait, None for no limit.
+        Raises queue.Full if there is no room.
+        """
+        node = Node(data=data)
+        with self._put_lock:
+            capacity = self._capacity
+            if capacity and self._size >= capacity and not self._wait(
+                    self._not_full, lambda: self._size < capacity, block, timeout):
+                raise queue.Full
+
+            self.tail._next = node
+            self.tail = node
+            size = self._add_to_size(1)
+            # Wake up another producer if there is still room
+            if capacity and size + 1 < capacity:
+                self._not_full.notify()
+
+        # Consumers may be waiting only if the list was empty
+        if size == 0:
+            with self._take_lock:
+                self._not_empty.notify()
+
+    def pop_first(self, block: bool = True, timeout: float = None) -> object:
+        """
+        Removes the first node and returns its data.
+        param block: whether to wait for a node in an empty list.
+        param timeout: maximum number of seconds to wait, None for no limit.
+        Raises queue.Empty if there is no node.
+        """
+        with self._take_lock:
+            if self._size == 0 and not self._wait(
+                    self._not_empty, lambda: self._size > 0, block, timeout):
+                raise queue.Empty
+
+            # The first node becomes the new dummy node
+            node = self.head._next
+            data = node._data
+            node._data = None
+            self.head = node
+            size = self._add_to_size(-1)
+            # Wake up another consumer if there are still nodes
+            if size > 1:
+                self._not_empty.notify()
+
+        # Producers may be waiting only if the list was full
+        if size == self._capacity:
+            with self._put_lock:
+                self._not_full.notify()
+
+        return data
+
+
+def benchmark_unrolled(size: int = 100000):  # pragma: no cover
+    """
+    Compares the time to read every value and the bytes per element of
+    both layouts, iterating over nodes (or node-like items) and over the
+    bare values of the unrolled list.
+    """
+    values = [str(value) for value in range(size)]
+
+    def read_nodes(custom_list):
+        for node in custom_list:
+            _ = node.data
+
+    def read_values(custom_list):
+        for value in custom_list.values():
+            _ = value
+
+    layouts = [
+        ('node per element', lambda: CustomLinkedList(values), read_nodes),
+        ('unrolled items', lambda: UnrolledLinkedList(values), read_nodes),
+        ('unrolled values', lambda: UnrolledLinkedList(values), read_values),
+    ]
+
+    print(f'{"layout":>18} {"iteration (ms)":>15} {"bytes per element":>18}')
+    for (name, build, iterate) in layouts:
+        # Values are created before tracing, so only the structure is measured
+        tracemalloc.start()
+        custom_list = build()
+        (current, _) = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        elapsed = min(timeit.repeat(lambda: iterate(custom_list), number=1, repeat=5))
+        print(f'{name:>18} {elapsed * 1000:>15.2f} {current / size:>18.1f}')
+
+
+def benchmark_concurrent(producers: int = 4, consumers: int = 4,
+                         size: int = 100000):  # pragma: no cover
+    """
+    Compares the time to move size values from producers to consumers
+    threads through a queue.Queue, a CustomLinkedList guarded by a global
+    lock and a ConcurrentLinkedList.
+    """
+
+    def run(put, get):
+        def producer(count):
+            for value in range(count):
+                put(value)
+
+        def consumer(count):
+            for _ in range(count):
+                get()
+
+        threads = [threading.Thread(target=producer, args=(size // producers,))
+                   for _ in range(producers)]
+        threads += [threading.Thread(target=consumer, args=(size // consumers,))
+                    for _ in range(consumers)]
+
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        return time.perf_counter() - start
+
+    fifo = queue.Queue()
+    lock = threading.Condition()
+    locked_list = CustomLinkedList()
+
+    def locked_put(value):
+        with lock:
+            locked_list.add_last(value)
+            lock.notify()
+
+    def locked_get():
+        with lock:
+            while locked_list.head is None:
+                lock.wait()
+            return locked_list.pop_first()
+
+    concurrent_list = ConcurrentLinkedList()
+
+    variants = [
+        ('queue.Queue', fifo.put, fifo.get),
+        ('coarse-locked list', locked_put, locked_get),
+        ('concurrent list', concurrent_list.add_last, concurrent_list.pop_first),
+    ]
+
+    print(f'{"variant":>20} {"elapsed (ms)":>13}')
+    for (name, put, get) in variants:
+        elapsed = run(put, get)
+        print(f'{name:>20} {elapsed * 1000:>13.2f}')
 
 
 def print_content(custom_list):
@@ -0,0 +1,447 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+""" Contains classes for implementing a disk-backed B-tree index """
+
+__package_name__ = "python_samples"
+__authors__ = "Marco Espinosa"
+__license__ = "MIT License"
+__version__ = "1.0"
+__maintainer__ = "Marco Espinosa"
+__email__ = "hi@marcoespinosa.es"
+__status__ = "Development"
+
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+from typing import Iterable, Iterator, Tuple
+import mmap
+import os
+import struct
+import tempfile
+
+# Default size of a page in bytes
+PAGE_SIZE = 4096
+
+# Default number of decoded pages kept in memory
+CACHE_SIZE = 256
+
+# Meta page layout: magic, page size, root page, page count and item count
+META = struct.Struct('<8sIqqq')
+MAGIC = b'PYBTREE1'
+
+# Node page header: is leaf, number of keys and next leaf page
+HEADER = struct.Struct('<BHq')
+HEADER_SIZE = 16
+
+# Keys, values and child page numbers are signed 64-bit integers
+ITEM_SIZE = 8
+
+# The number of keys of a page has to fit in the unsigned short of the header
+MAX_PAGE_SIZE = HEADER_SIZE + 0xFFFF * 2 * ITEM_SIZE
+
+# Page number meaning there is no next leaf
+NO_PAGE = -1
+
+
+class _Page:
+    """
+    Decoded page of the B-tree.
+    Leaf pages hold keys and values, internal pages hold keys and the
+    page numbers of their children (one more than keys).
+    """
+
+    __slots__ = ('page_id', 'leaf', 'keys', 'values', 'next', 'dirty')
+
+    def __init__(self, page_id: int, leaf: bool) -> None:
+        self.page_id = page_id
+        self.leaf = leaf
+        self.keys = array('q')
+        # Values for leaves, child page numbers for internal pages
+        self.values = array('q')
+        # Next leaf page, to iterate in order
+        self.next = NO_PAGE
+        self.dirty = False
+
+
+class DiskBTree:
+    """
+    Implementation of a disk-backed B+tree index of 64-bit integer keys
+    and values. The tree is stored in a file of fixed-size pages accessed
+    through mmap, so an existing index opens instantly and only the pages
+    touched by a lookup are read.
+    - Page 0 holds the meta data (root page, number of pages and items).
+    - Internal pages hold up to (page_size - 24) // 16 keys, so a 4 KiB
+    page has a fan-out of 255 and the tree stays very shallow.
+    - Leaf pages hold up to (page_size - 16) // 16 key/value pairs and are
+    linked, so range iteration does not go back to the root.
+    Decoded pages are kept in a LRU page cache and dirty pages are written
+    back to the map when they are evicted or the tree is flushed.
+    """
+
+    def __init__(self, path, page_size: int = PAGE_SIZE, cache_size: int = CACHE_SIZE) -> None:
+        """
+        Default constructor. Opens the index file, or creates it.
+        param path: path of the index file.
+        param page_size: size of the pages of a new file.
+        param cache_size: maximum number of decoded pages kept in memory.
+        """
+        self._cache = OrderedDict()
+        self._cache_size = max(cache_size, 1)
+
+        exists = os.path.exists(path) and os.path.getsize(path) > 0
+        if not exists:
+            # Check the page size before creating the file
+            self._set_page_size(page_size)
+
+        self._file = open(path, 'r+b' if exists else 'w+b')
+        try:
+            if exists:
+                header = self._file.read(META.size)
+                if len(header) < META.size:
+                    raise ValueError(f"{path} is not a B-tree index file!")
+
+                (magic, page_size, self._root, self._page_count, self._length) = META.unpack(header)
+                if magic != MAGIC:
+                    raise ValueError(f"{path} is not a B-tree index file!")
+                self._set_page_size(page_size)
+            else:
+                self._file.truncate(2 * page_size)
+                self._root = 1
+                self._page_count = 2
+                self._length = 0
+
+            self._mmap = mmap.mmap(self._file.fileno(), 0)
+        except BaseException:
+            self._file.close()
+            raise
+
+        if not exists:
+            # Empty root leaf
+            self._write_page(_Page(self._root, True))
+            self._write_meta()
+
+    def _set_page_size(self, page_size: int) -> None:
+        """ Computes the capacities of the pages """
+        self._page_size = page_size
+        self._leaf_capacity = (page_size - HEADER_SIZE) // (2 * ITEM_SIZE)
+        self._internal_capacity = (page_size - HEADER_SIZE - ITEM_SIZE) // (2 * ITEM_SIZE)
+
+        if self._internal_capacity < 2:
+            raise ValueError(f"Page size {page_size} is too small!")
+        if page_size > MAX_PAGE_SIZE:
+            raise ValueError(f"Page size {page_size} is too big, the maximum is {MAX_PAGE_SIZE}!")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        """ Number of keys in the index """
+        return self._length
+
+    def __contains__(self, key) -> bool:
+        """ Checks whether the key exists """
+        return self._find(key)
+
+    def __iter__(self) -> Iterator:
+        """ Keys iterator, in order """
+        for (key, _) in self.items():
+            yield key
+
+    @classmethod
+    def bulk_load(cls, path, items: Iterable[Tuple[int, int]], page_size: int = PAGE_SIZE,
+                  cache_size: int = CACHE_SIZE, overwrite: bool = False):
+        """
+        Creates a new index file from (key, value) pairs sorted by key.
+        Leaves are filled one after the other and each internal level is
+        built from the first keys of the level below, so the whole load
+        is a single sequential pass without splits.
+        An existing file is only replaced if overwrite is True, otherwise
+        FileExistsError is raised.
+        """
+        if os.path.exists(path):
+            if not overwrite:
+                raise FileExistsError(f"{path} already exists!")
+            os.remove(path)
+
+        tree = cls(path, page_size, cache_size)
+        # The empty root leaf is reused as the first leaf
+        leaf = _Page(tree._root, True)
+        level = [(None, leaf.page_id)]
+        last_key = None
+
+        for (key, value) in items:
+            if last_key is not None and key <= last_key:
+                # Do not leave a partial index behind
+                tree.close()
+                os.remove(path)
+                raise ValueError("Keys have to be unique and sorted in ascending order!")
+            last_key = key
+
+            if len(leaf.keys) == tree._leaf_capacity:
+                new_leaf = _Page(tree._allocate_page(), True)
+                leaf.next = new_leaf.page_id
+                tree._write_page(leaf)
+                leaf = new_leaf
+                level.append((key, leaf.page_id))
+
+            leaf.keys.append(key)
+            leaf.values.append(value)
+            tree._length += 1
+
+        tree._write_page(leaf)
+
+        # Build the internal levels until there is a single root
+        fan_out = tree._internal_capacity + 1
+        while len(level) > 1:
+            upper_level = []
+            for start in range(0, len(level), fan_out):
+                group = level[start:start + fan_out]
+                page = _Page(tree._allocate_page(), False)
+                page.keys.extend(first_key for (first_key, _) in group[1:])
+                page.values.extend(page_id for (_, page_id) in group)
+                tree._write_page(page)
+                upper_level.append((group[0][0], page.page_id))
+
+            level = upper_level
+
+        tree._root = level[0][1]
+        tree._write_meta()
+        return tree
+
+    def get(self, key, default=None):
+        """ Returns the value of the key, or default if it does not exist """
+        page = self._find_leaf(key)
+        index = bisect_left(page.keys, key)
+
+        if index < len(page.keys) and page.keys[index] == key:
+            return page.values[index]
+
+        return default
+
+    def _find(self, key) -> bool:
+        """ Checks whether the key exists in its leaf """
+        page = self._find_leaf(key)
+        index = bisect_left(page.keys, key)
+        return index < len(page.keys) and page.keys[index] == key
+
+    def _find_leaf(self, key) -> _Page:
+        """ Descends from the root to the leaf where the key belongs """
+        page = self._get_page(self._root)
+        while not page.leaf:
+            page = self._get_page(page.values[bisect_right(page.keys, key)])
+
+        return page
+
+    def insert(self, key: int, value: int) -> None:
+        """ Inserts the key with the given value, or updates its value """
+        split = self._insert(self._root, key, value)
+
+        if split is not None:
+            # The root was split, the tree grows one level
+            root = _Page(self._allocate_page(), False)
+            root.keys.append(split[0])
+            root.values.extend((self._root, split[1]))
+            self._mark_dirty(root)
+            self._root = root.page_id
+
+    def _insert(self, page_id: int, key: int, value: int):
+        """
+        Auxiliary function to do the recursive work of insert.
+        Returns (separator key, new page) when the page was split, or None.
+        """
+        page = self._get_page(page_id)
+
+        if page.leaf:
+            index = bisect_left(page.keys, key)
+            if index < len(page.keys) and page.keys[index] == key:
+                page.values[index] = value
+                self._mark_dirty(page)
+                return None
+
+            page.keys.insert(index, key)
+            page.values.insert(index, value)
+            self._length += 1
+            self._mark_dirty(page)
+
+            if len(page.keys) <= self._leaf_capacity:
+                return None
+
+            # Move the upper half to a new leaf
+            new_page = _Page(self._allocate_page(), True)
+            middle = len(page.keys) // 2
+            new_page.keys = page.keys[middle:]
+            new_page.values = page.values[middle:]
+            del page.keys[middle:]
+            del page.values[middle:]
+            new_page.next = page.next
+            page.next = new_page.page_id
+            self._mark_dirty(new_page)
+
+            return (new_page.keys[0], new_page.page_id)
+
+        index = bisect_right(page.keys, key)
+        split = self._insert(page.values[index], key, value)
+        if split is None:
+            return None
+
+        page.keys.insert(index, split[0])
+        page.values.insert(index + 1, split[1])
+        self._mark_dirty(page)
+
+        if len(page.keys) <= self._internal_capacity:
+            return None
+
+        # Move the upper half to a new page, the middle key goes up
+        new_page = _Page(self._allocate_page(), False)
+        middle = len(page.keys) // 2
+        separator = page.keys[middle]
+        new_page.keys = page.keys[middle + 1:]
+        new_page.values = page.values[middle + 1:]
+        del page.keys[middle:]
+        del page.values[middle + 1:]
+        self._mark_dirty(new_page)
+
+        return (separator, new_page.page_id)
+
+    def items(self, low=None, high=None) -> Iterator[Tuple[int, int]]:
+        """ Lazy iterator of the (key, value) pairs between low and high (both included) """
+        if low is None:
+            page = self._get_page(self._root)
+            while not page.leaf:
+                page = self._get_page(page.values[0])
+            index = 0
+        else:
+            page = self._find_leaf(low)
+            index = bisect_left(page.keys, low)
+
+        while True:
+            for position in range(index, len(page.keys)):
+                if high is not None and page.keys[position] > high:
+                    return
+                yield (page.keys[position], page.values[position])
+
+            if page.next == NO_PAGE:
+                return
+
+            page = self._get_page(page.next)
+            index = 0
+
+    def flush(self) -> None:
+        """ Writes the dirty pages and the meta data to the file """
+        for page in self._cache.values():
+            if page.dirty:
+                self._write_page(page)
+
+        self._write_meta()
+        self._mmap.flush()
+
+    def close(self) -> None:
+        """ Flushes and closes the index file """
+        if self._file.closed:
+            return
+
+        self.flush()
+        self._cache.clear()
+        self._mmap.close()
+        self._file.close()
+
+    def _get_page(self, page_id: int) -> _Page:
+        """ Returns a decoded page, from the cache if possible """
+        page = self._cache.get(page_id)
+        if page is not None:
+            self._cache.move_to_end(page_id)
+            return page
+
+        page = self._read_page(page_id)
+        self._cache_page(page)
+        return page
+
+    def _mark_dirty(self, page: _Page) -> None:
+        """ Marks a page as modified, (re)adding it to the cache """
+        page.dirty = True
+        self._cache_page(page)
+
+    def _cache_page(self, page: _Page) -> None:
+        """ Adds a page to the cache and evicts the least recently used ones """
+        self._cache[page.page_id] = page
+        self._cache.move_to_end(page.page_id)
+
+        while len(self._cache) > self._cache_size:
+            (_, evicted) = self._cache.popitem(last=False)
+            if evicted.dirty:
+                self._write_page(evicted)
+
+    def _read_page(self, page_id: int) -> _Page:
+        """ Decodes a page from the map """
+        offset = page_id * self._page_size
+        (leaf, count, next_page) = HEADER.unpack_from(self._mmap, offset)
+
+        page = _Page(page_id, bool(leaf))
+        page.next = next_page
+
+        keys_offset = offset + HEADER_SIZE
+        values_offset = keys_offset + ITEM_SIZE * (self._leaf_capacity if leaf else self._internal_capacity)
+        values_count = count if leaf else count + 1
+
+        page.keys.frombytes(self._mmap[keys_offset:keys_offset + ITEM_SIZE * count])
+        page.values.frombytes(self._mmap[values_offset:values_offset + ITEM_SIZE * values_count])
+
+        return page
+
+    def _write_page(self, page: _Page) -> None:
+        """ Encodes a page into the map """
+        offset = page.page_id * self._page_size
+        HEADER.pack_into(self._mmap, offset, page.leaf, len(page.keys), page.next)
+
+        keys_offset = offset + HEADER_SIZE
+        values_offset = keys_offset + ITEM_SIZE * (self._leaf_capacity if page.leaf else self._internal_capacity)
+
+        keys = page.keys.tobytes()
+        values = page.values.tobytes()
+        self._mmap[keys_offset:keys_offset + len(keys)] = keys
+        self._mmap[values_offset:values_offset + len(values)] = values
+
+        page.dirty = False
+
+    def _write_meta(self) -> None:
+        """ Encodes the meta page into the map """
+        META.pack_into(self._mmap, 0, MAGIC, self._page_size, self._root,
+                       self._page_count, self._length)
+
+    def _allocate_page(self) -> int:
+        """ Returns the number of a new page, growing the file if needed """
+        page_id = self._page_count
+        self._page_count += 1
+
+        needed = self._page_count * self._page_size
+        if needed > len(self._mmap):
+            # The file size is doubled, so growing is amortized O(1)
+            self._mmap.close()
+            self._file.truncate(max(needed, 2 * self._file.seek(0, os.SEEK_END)))
+            self._mmap = mmap.mmap(self._file.fileno(), 0)
+
+        return page_id
+
+
+def main():
+    """ Main method """
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'index.btree')
+
+        with DiskBTree.bulk_load(path, ((key, key * key) for key in range(100000))) as tree:
+            tree.insert(-1, 1)
+            print(f'Bulk-loaded {len(tree)} keys, size of the file: {os.path.getsize(path)} bytes')
+
+        # Reopening the index does not load its content
+        with DiskBTree(path) as tree:
+            print(f'Value of key 1234: {tree.get(1234)}')
+            print(f'Keys between 10 and 15: {list(tree.items(10, 15))}')
+
+
+# main execution
+if __name__ == "__main__":
+    main()
@@ -2,25 +2,454 @@
 # -*- coding: utf-8 -*-
 """ This file contains the Quicksort algorithm implementation """
 
+from array import array as typed_array
+from bisect import bisect_left, bisect_right
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+import heapq
+import mmap
+import os
+import random
+import tempfile
+import timeit
+
+try:
+    import numpy
+except ImportError:  # pragma: no cover
+    numpy = None
+
+# Slices smaller than this are finished with insertion sort
+INSERTION_SORT_THRESHOLD = 16
+
+# Slices bigger than this use the ninther (median of three medians) as pivot
+NINTHER_THRESHOLD = 128
+
+# Arrays smaller than this are sorted sequentially in parallel mode
+PARALLEL_CUTOFF = 100000
+
+# Typecodes that can be shared between processes in parallel mode
+SHARED_TYPECODES = 'bBhHiIlLqQfd'
+
+# Default memory budget for the external sort (64 MiB)
+EXTERNAL_MEMORY_LIMIT = 64 * 1024 * 1024
+
+
+def _sort_shared_range(name, typecode, low, high):
+    """ Worker function for the parallel mode.
+        Sorts array[low:high + 1] of the shared memory block in place """
+    from multiprocessing import shared_memory
+
+    shm = shared_memory.SharedMemory(name=name)
+    view = shm.buf.cast(typecode)
+    chunk = view[low:high + 1]
+    try:
+        QuickSort(chunk, mode=QuickSort.INTROSORT).run()
+    finally:
+        # Exported buffers have to be released before closing the block
+        chunk.release()
+        view.release()
+        shm.close()
+
 
 class QuickSort():
     """ This implementation utilizes pivot as the last element in the nums list
     It has a pointer to keep track of the elements smaller than the pivot
     At the very end of partition() function, the pointer is swapped with the pivot
-    to come up with a "sorted" nums relative to the pivot """
+    to come up with a "sorted" nums relative to the pivot
 
-    def __init__(self, array):
+    Available modes:
+        - CLASSIC: the textbook recursive quicksort described above.
+        - INTROSORT: median-of-three/ninther pivots, recursion only on the
+        smaller partition, heapsort once the depth passes 2*log2(n) and
+        insertion sort for small slices. Worst case is O(n log n) and the
+        stack depth is bounded by log2(n).
+        - THREE_WAY: introsort with a Dutch national flag partition. The whole
+        band of elements equal to the pivot is removed from the recursion, so
+        inputs with few distinct keys sort in close to linear time.
+        - PARALLEL: for numeric data. The top levels are partitioned serially and
+        the independent sub-ranges are sorted by a pool of processes working
+        directly on a multiprocessing.shared_memory block (Python 3.8+).
+
+    Besides Python lists, array.array, memoryview and NumPy arrays are sorted
+    in place without converting them to lists. When NumPy is installed, the
+    buffer is wrapped by a zero-copy ndarray view and sorted by NumPy's typed
+    introsort. Otherwise, the introsort engine runs directly on the buffer.
+
+    Selection operations (select, select_many, nth_element, top_k and
+    partial_sort) only recurse into the side of the partition holding the
+    wanted positions. They run in expected O(n) and fall back to heapsort like
+    introsort, so the worst case is O(n log n).
+
+    run() also accepts a key function, a reverse flag and a stable mode. Keys
+    are computed exactly once (decorate-sort-undecorate) and the partition
+    loop only compares (key, position) pairs, so the payloads are never
+    compared. Ties are broken by the original position, which makes sorting
+    with a key always stable. """
+
+    CLASSIC = "classic"
+    INTROSORT = "introsort"
+    THREE_WAY = "three_way"
+    PARALLEL = "parallel"
+    MODES = (CLASSIC, INTROSORT, THREE_WAY, PARALLEL)
+
+    def __init__(self, array, mode=CLASSIC, workers=None, parallel_cutoff=PARALLEL_CUTOFF,
+                 key=None, reverse=False, stable=False):
         """ Default constructors
 
             params:
                 @array: Array of numbers
+                @mode: Sorting mode, one of QuickSort.MODES
+                @workers: Number of processes for the parallel mode (default: cpu count)
+                @parallel_cutoff: Size below which the parallel mode sorts sequentially
+                @key: Function computing the comparison key of each element
+                @reverse: Sort in descending order
+                @stable: Keep the original order of elements with equal keys
         """
 
+        if mode not in self.MODES:
+            raise ValueError(f"Unknown quicksort mode {mode}!")
+
         self._data = array
+        self._mode = mode
+        self._workers = workers or os.cpu_count() or 1
+        self._parallel_cutoff = parallel_cutoff
+        self._key = key
+        self._reverse = reverse
+        self._stable = stable
 
     def run(self):
         """ Launches quicksort algorithm """
-        self._quick_sort(self._data, 0, len(self._data) - 1)
+        if self._key is not None or self._stable:
+            self._run_decorated()
+            return
+
+        self._run()
+
+        if self._reverse:
+            self._reverse_in_place(self._data)
+
+    def _run(self):
+        """ Function to sort the data in ascending order with the selected mode """
+        if self._mode == self.PARALLEL:
+            self._run_parallel()
+        elif self._is_buffer(self._data):
+            self._run_buffer()
+        elif self._mode in (self.INTROSORT, self.THREE_WAY):
+            self._intro_sort(self._data, 0, len(self._data) - 1,
+                             2 * len(self._data).bit_length())
+        else:
+            self._quick_sort(self._data, 0, len(self._data) - 1)
+
+    def _run_decorated(self):
+        """ Function to sort by precomputed keys (decorate-sort-undecorate) """
+        data = self._data
+        values = list(data)
+        key = self._key
+
+        # Reversed positions keep equal keys in their original order once the
+        # ascending result is reversed
+        sign = -1 if self._reverse else 1
+
+        if key is None:
+            decorated = [(value, sign * i) for (i, value) in enumerate(values)]
+        else:
+            decorated = [(key(value), sign * i) for (i, value) in enumerate(values)]
+
+        # Decorated pairs are distinct and not numeric, so they are always sorted
+        # by the sequential introsort, which is safe on already sorted keys
+        QuickSort(decorated, mode=self.INTROSORT).run()
+
+        if self._reverse:
+            decorated.reverse()
+
+        if isinstance(data, list):
+            data[:] = [values[sign * i] for (_, i) in decorated]
+        else:
+            for (position, (_, i)) in enumerate(decorated):
+                data[position] = values[sign * i]
+
+    @staticmethod
+    def _reverse_in_place(array):
+        """ Function to reverse a sorted array in place """
+        if hasattr(array, 'reverse'):
+            # Python lists and array.array
+            array.reverse()
+            return
+
+        (low, high) = (0, len(array) - 1)
+        while low < high:
+            (array[low], array[high]) = (array[high], array[low])
+            low += 1
+            high -= 1
+
+    def nth_element(self, k):
+        """ Rearranges the data in place so that data[k] is the element that
+            would be there if it was sorted. Smaller or equal elements are moved
+            before it and greater or equal elements after it.
+
+            params:
+                @k: Position to select, negative values count from the end
+        """
+        self._select_positions([self._normalize_position(k)])
+
+    def select(self, k):
+        """ Returns the k-th smallest element (0 based).
+            The data is rearranged in place, as done by nth_element """
+        k = self._normalize_position(k)
+        self._select_positions([k])
+        return self._data[k]
+
+    def select_many(self, positions):
+        """ Returns the elements at several sorted positions in one pass,
+            e.g. some percentiles. Positions are returned in the given order.
+            The data is rearranged in place, so each position holds the element
+            that would be there if it was sorted. Pass a copy to keep the order """
+        positions = [self._normalize_position(k) for k in positions]
+        self._select_positions(sorted(set(positions)))
+        return [self._data[k] for k in positions]
+
+    def top_k(self, k):
+        """ Returns the k greatest elements in descending order.
+            The data is rearranged in place: the k greatest elements end sorted
+            at its tail and the order of the rest is unspecified """
+        size = len(self._data)
+        k = min(max(k, 0), size)
+        if k == 0:
+            return []
+
+        # The k greatest elements end at the tail, only that slice is sorted
+        self._select_positions([size - k])
+        self._intro_sort(self._data, size - k, size - 1, 2 * k.bit_length())
+
+        return [self._data[i] for i in range(size - 1, size - k - 1, -1)]
+
+    def partial_sort(self, k):
+        """ Rearranges the data in place so that data[:k] holds the k smallest
+            elements in ascending order. The order of the rest is unspecified """
+        k = min(max(k, 0), len(self._data))
+        if k == 0:
+            return
+
+        self._select_positions([k - 1])
+        self._intro_sort(self._data, 0, k - 2, 2 * k.bit_length())
+
+    def _normalize_position(self, k):
+        """ Function to validate a position, negative values count from the end """
+        size = len(self._data)
+        if not -size <= k < size:
+            raise IndexError(f"Position {k} out of range!")
+
+        return k + size if k < 0 else k
+
+    def _select_positions(self, positions):
+        """ Function to place the elements of the sorted positions (in ascending
+            order) in their final place. Only the partitions holding some of
+            the positions are processed """
+        array = self._data
+
+        view = self._numpy_view(array) if self._is_buffer(array) else None
+        if view is not None:
+            view.partition(positions)
+            return
+
+        depth_limit = 2 * len(array).bit_length()
+        stack = [(0, len(array) - 1, 0, len(positions), depth_limit)]
+
+        while stack:
+            (low, high, first_k, last_k, depth_limit) = stack.pop()
+
+            if first_k >= last_k or low >= high:
+                continue
+
+            if high - low < INSERTION_SORT_THRESHOLD:
+                self._insertion_sort(array, low, high)
+                continue
+
+            # Too many bad pivots, sort the slice with the guaranteed O(n log n) heapsort
+            if depth_limit == 0:
+                self._heap_sort(array, low, high)
+                continue
+
+            pivot_index = self._choose_pivot(array, low, high)
+            (array[pivot_index], array[high]) = (array[high], array[pivot_index])
+
+            if self._mode == self.THREE_WAY:
+                (first, last) = self._partition_three_way(array, low, high)
+            else:
+                first = last = self._partition(array, low, high)
+
+            # Positions in array[first:last + 1] are already in place
+            left_end = bisect_left(positions, first, first_k, last_k)
+            right_start = bisect_right(positions, last, first_k, last_k)
+
+            stack.append((low, first - 1, first_k, left_end, depth_limit - 1))
+            stack.append((last + 1, high, right_start, last_k, depth_limit - 1))
+
+    @staticmethod
+    def _is_buffer(array):
+        """ Function to check whether the array is a typed buffer """
+        if numpy is not None and isinstance(array, numpy.ndarray):
+            return True
+
+        return isinstance(array, (typed_array, memoryview))
+
+    @staticmethod
+    def _numpy_view(array):
+        """ Function to get a writable ndarray sharing memory with the buffer,
+            or None when NumPy is not available, the format is not numeric
+            or the memoryview is not contiguous """
+        if numpy is None:
+            return None
+
+        if isinstance(array, numpy.ndarray):
+            return array
+
+        # frombuffer can not wrap strided memoryviews, they fall back to introsort
+        if isinstance(array, memoryview) and not array.c_contiguous:
+            return None
+
+        format_ = array.typecode if isinstance(array, typed_array) else array.format
+        try:
+            dtype = numpy.dtype(format_)
+        except TypeError:
+            return None
+
+        if dtype.kind not in 'biuf':
+            return None
+
+        return numpy.frombuffer(array, dtype=dtype)
+
+    def _run_buffer(self):
+        """ Function to sort a typed buffer in place """
+        if isinstance(self._data, memoryview) and self._data.ndim != 1:
+            raise ValueError("Only one-dimensional memoryviews can be sorted!")
+
+        view = self._numpy_view(self._data)
+
+        if view is not None:
+            if view.ndim != 1:
+                raise ValueError("Only one-dimensional arrays can be sorted!")
+
+            # NumPy's quicksort is a typed introsort working on unboxed values
+            view.sort(kind='quicksort')
+        else:
+            # The classic recursion is not safe for big buffers, so always use introsort
+            self._intro_sort(self._data, 0, len(self._data) - 1,
+                             2 * len(self._data).bit_length())
+
+    def _shared_typecode(self):
+        """ Function to get the array.array typecode used to share the data """
+        data = self._data
+
+        if isinstance(data, typed_array):
+            typecode = data.typecode
+        elif isinstance(data, memoryview):
+            typecode = data.format
+        elif numpy is not None and isinstance(data, numpy.ndarray):
+            typecode = data.dtype.char
+        elif all(type(value) is int for value in data):
+            typecode = 'q'
+        elif all(type(value) is float for value in data):
+            typecode = 'd'
+        else:
+            raise TypeError("Parallel mode only sorts homogeneous numeric data!")
+
+        if typecode not in SHARED_TYPECODES:
+            raise TypeError(f"Parallel mode can not share {typecode} typed data!")
+
+        return typecode
+
+    def _shared_source(self, typecode):
+        """ Function to get the bytes of the data to be copied into shared memory,
+            or None when they can not be shared: strided buffers, or integers
+            out of the typecode range """
+        if self._is_buffer(self._data):
+            source = memoryview(self._data)
+            if not source.c_contiguous:
+                source.release()
+                return None
+            return source.cast('B')
+
+        try:
+            return memoryview(typed_array(typecode, self._data)).cast('B')
+        except OverflowError:
+            return None
+
+    def _split_ranges(self, array, low, high):
+        """ Function to partition the top levels serially.
+            Returns independent (low, high) ranges small enough to be sorted in parallel """
+        view = self._numpy_view(array)
+        ranges = [(low, high)]
+        done = []
+
+        while ranges and len(ranges) + len(done) < 4 * self._workers:
+            # Always split the largest pending range
+            ranges.sort(key=lambda bounds: bounds[1] - bounds[0])
+            (low, high) = ranges.pop()
+
+            if high - low < self._parallel_cutoff:
+                done.append((low, high))
+                continue
+
+            if view is not None:
+                # Vectorized selection of the median, which ends in its final place
+                first = last = (low + high) // 2
+                view[low:high + 1].partition(first - low)
+            else:
+                pivot_index = self._choose_pivot(array, low, high)
+                (array[pivot_index], array[high]) = (array[high], array[pivot_index])
+                (first, last) = self._partition_three_way(array, low, high)
+
+            ranges += [(low, first - 1), (last + 1, high)]
+
+        return [bounds for bounds in ranges + done if bounds[0] < bounds[1]]
+
+    def _run_parallel(self):
+        """ Function to sort numeric data with a pool of processes over shared memory """
+        size = len(self._data)
+        typecode = self._shared_typecode()
+
+        try:
+            from multiprocessing import shared_memory
+        except ImportError:  # pragma: no cover
+            shared_memory = None
+
+        source = None
+        if shared_memory is not None and self._workers >= 2 and size >= self._parallel_cutoff:
+            source = self._shared_source(typecode)
+
+        if source is None:
+            QuickSort(self._data, mode=self.INTROSORT).run()
+            return
+
+        nbytes = size * typed_array(typecode).itemsize
+        shm = shared_memory.SharedMemory(create=True, size=nbytes)
+        raw = shm.buf[:nbytes]
+        view = raw.cast(typecode)
+        try:
+            # Copy the data into the shared block
+            raw[:] = source
+
+            ranges = self._split_ranges(view, 0, size - 1)
+
+            with ProcessPoolExecutor(max_workers=self._workers) as executor:
+                futures = [executor.submit(_sort_shared_range, shm.name, typecode, low, high)
+                           for (low, high) in ranges]
+
+                for future in futures:
+                    future.result()
+
+            # Copy the sorted data back
+            if self._is_buffer(self._data):
+                memoryview(self._data).cast('B')[:] = raw
+            else:
+                self._data[:] = view.tolist()
+        finally:
+            source.release()
+            view.release()
+            raw.release()
+            shm.close()
+            shm.unlink()
 
     def _partition(self, array, low, high):
         """ Function to find the partition position """
@@ -49,6 +478,33 @@ class QuickSort():
         # Return the position from where partition is done
         return i + 1
 
+    @staticmethod
+    def _partition_three_way(array, low, high):
+        """ Function to split the slice in three bands: smaller than,
+            equal to and greater than the pivot (Dutch national flag).
+            Returns the first and last positions of the equal band """
+
+        # choose the rightmost element as pivot
+        pivot = array[high]
+
+        # array[low:lt] < pivot, array[lt:i] == pivot, array[gt + 1:high + 1] > pivot
+        lt = low
+        i = low
+        gt = high
+
+        while i <= gt:
+            if array[i] < pivot:
+                (array[lt], array[i]) = (array[i], array[lt])
+                lt += 1
+                i += 1
+            elif pivot < array[i]:
+                (array[i], array[gt]) = (array[gt], array[i])
+                gt -= 1
+            else:
+                i += 1
+
+        return lt, gt
+
     def _quick_sort(self, array, low, high):
         """ Function to perform the quicksort """
         if low < high:
@@ -64,12 +520,267 @@ class QuickSort():
             # Recursive call on the right of pivot
             self._quick_sort(array, pivot + 1, high)
 
+    def _intro_sort(self, array, low, high, depth_limit):
+        """ Function to perform the introsort.
+            It loops on the larger partition and only recurses on the smaller one,
+            so the stack never grows deeper than log2(n) """
+        while high - low >= INSERTION_SORT_THRESHOLD:
+
+            # Too many bad pivots, switch to the guaranteed O(n log n) heapsort
+            if depth_limit == 0:
+                self._heap_sort(array, low, high)
+                return
+
+            depth_limit -= 1
+
+            # Move the selected pivot to the rightmost position, as _partition expects
+            pivot_index = self._choose_pivot(array, low, high)
+            (array[pivot_index], array[high]) = (array[high], array[pivot_index])
+            if self._mode == self.THREE_WAY:
+                (first, last) = self._partition_three_way(array, low, high)
+            else:
+                first = last = self._partition(array, low, high)
+
+            # Recursive call on the smaller side, loop on the larger one.
+            # Elements in array[first:last + 1] are already in place
+            if first - low < high - last:
+                self._intro_sort(array, low, first - 1, depth_limit)
+                low = last + 1
+            else:
+                self._intro_sort(array, last + 1, high, depth_limit)
+                high = first - 1
+
+        self._insertion_sort(array, low, high)
+
+    @staticmethod
+    def _median_of_three(array, i, j, k):
+        """ Function to get the index of the median value of three positions """
+        if array[i] < array[j]:
+            if array[j] < array[k]:
+                return j
+            return k if array[i] < array[k] else i
+
+        if array[i] < array[k]:
+            return i
+        return k if array[j] < array[k] else j
+
+    def _choose_pivot(self, array, low, high):
+        """ Function to choose the pivot index:
+            median of three for medium slices and ninther for the big ones """
+        mid = (low + high) // 2
+
+        if high - low < NINTHER_THRESHOLD:
+            return self._median_of_three(array, low, mid, high)
+
+        step = (high - low) // 8
+        return self._median_of_three(
+            array,
+            self._median_of_three(array, low, low + step, low + 2 * step),
+            self._median_of_three(array, mid - step, mid, mid + step),
+            self._median_of_three(array, high - 2 * step, high - step, high))
+
+    @staticmethod
+    def _insertion_sort(array, low, high):
+        """ Function to sort small slices in place """
+        for i in range(low + 1, high + 1):
+            value = array[i]
+            j = i - 1
+
+            # Shift greater elements one position to the right
+            while j >= low and value < array[j]:
+                array[j + 1] = array[j]
+                j -= 1
+
+            array[j + 1] = value
+
+    @staticmethod
+    def _sift_down(array, low, start, end):
+        """ Function to restore the max-heap property of the heap stored
+            in array[low:end + 1], starting from the node at offset start """
+        root = start
+        value = array[low + root]
+        size = end - low + 1
+
+        while True:
+            child = 2 * root + 1
+            if child >= size:
+                break
+
+            # Select the greater child
+            if child + 1 < size and array[low + child] < array[low + child + 1]:
+                child += 1
+
+            if not value < array[low + child]:
+                break
+
+            array[low + root] = array[low + child]
+            root = child
+
+        array[low + root] = value
+
+    def _heap_sort(self, array, low, high):
+        """ Function to perform the heapsort on array[low:high + 1] """
+        size = high - low + 1
+
+        # Build the max-heap
+        for start in range(size // 2 - 1, -1, -1):
+            self._sift_down(array, low, start, high)
+
+        # Move the max to the end and shrink the heap
+        for end in range(high, low, -1):
+            (array[low], array[end]) = (array[end], array[low])
+            self._sift_down(array, low, 0, end - 1)
+
     @property
     def data(self):
         """" Property data """
         return self._data
 
 
+def _read_chunks(source, typecode, chunk_size):
+    """ Generator of array.array chunks of at most chunk_size items.
+        source is either a path to a binary file of typecode items or an iterable.
+        Each chunk is allocated once with its exact size, so reading it does not
+        over-allocate nor copy it, and it is not referenced after being yielded """
+    if isinstance(source, (str, bytes, os.PathLike)):
+        with open(source, 'rb') as file_:
+            while True:
+                chunk = typed_array(typecode, [0]) * chunk_size
+                (size, remainder) = divmod(file_.readinto(chunk), chunk.itemsize)
+                if remainder:
+                    raise ValueError(f"The size of {source} is not a multiple of the item size!")
+                if size < chunk_size:
+                    del chunk[size:]
+
+                if not chunk:
+                    return
+                yield chunk
+                del chunk
+    else:
+        iterator = iter(source)
+        while True:
+            chunk = typed_array(typecode, [0]) * chunk_size
+            size = 0
+            for value in islice(iterator, chunk_size):
+                chunk[size] = value
+                size += 1
+            if size < chunk_size:
+                del chunk[size:]
+
+            if not chunk:
+                return
+            yield chunk
+            del chunk
+
+
+def _read_run(path, typecode):
+    """ Generator of the values of a sorted run, read through a memory-mapped file """
+    # The map keeps its own file descriptor, so the file (and its buffer) is closed at once
+    with open(path, 'rb') as file_:
+        mapped = mmap.mmap(file_.fileno(), 0, access=mmap.ACCESS_READ)
+
+    with mapped:
+        view = memoryview(mapped).cast(typecode)
+        try:
+            for index in range(len(view)):
+                yield view[index]
+        finally:
+            # The view has to be released before the map is closed
+            view.release()
+
+
+def external_sort(source, memory_limit=EXTERNAL_MEMORY_LIMIT, typecode='d',
+                  mode=QuickSort.INTROSORT, temp_dir=None):
+    """ Out-of-core merge sort for data that does not fit in memory.
+        The input is read in chunks of memory_limit bytes, each chunk is sorted
+        with QuickSort and spilled to a temporary file as raw typecode items.
+        The runs are merged with a k-way heap merge over memory-mapped files.
+
+        params:
+            @source: Path to a binary file of typecode items, or an iterable of numbers
+            @memory_limit: Maximum number of bytes held in memory by a chunk
+            @typecode: array.array typecode of the values
+            @mode: QuickSort mode used to sort each run
+            @temp_dir: Directory for the temporary run files
+
+        Returns a generator of the sorted values.
+    """
+    chunk_size = max(1, memory_limit // typed_array(typecode).itemsize)
+    chunks = _read_chunks(source, typecode, chunk_size)
+
+    first = next(chunks, None)
+    if first is None:
+        return
+
+    QuickSort(first, mode=mode).run()
+
+    # A single chunk does not need to be spilled to disk
+    if len(first) < chunk_size:
+        yield from first
+        return
+
+    with tempfile.TemporaryDirectory(dir=temp_dir) as directory:
+        paths = []
+        chunk = first
+        del first
+
+        while chunk is not None:
+            if paths:
+                QuickSort(chunk, mode=mode).run()
+
+            paths.append(os.path.join(directory, f'run_{len(paths)}.bin'))
+            # Writing the buffer directly does not copy it, as tofile does in 64 KB blocks
+            with open(paths[-1], 'wb') as file_:
+                file_.write(chunk)
+
+            # Free the current chunk before reading the next one
+            chunk = None
+            chunk = next(chunks, None)
+
+        runs = [_read_run(path, typecode) for path in paths]
+        try:
+            yield from heapq.merge(*runs)
+        finally:
+            for run in runs:
+                run.close()
+
+
+def benchmark_three_way(size=100000, distinct_keys=(100000, 1000, 100, 10, 2)):  # pragma: no cover
+    """ Compares introsort and three-way modes as the number of distinct keys shrinks """
+    print(f'{"distinct keys":>14} {"introsort (s)":>14} {"three-way (s)":>14} {"speedup":>8}')
+
+    for keys in distinct_keys:
+        rand = random.Random(keys)
+        unsorted = [rand.randrange(keys) for _ in range(size)]
+        timings = []
+
+        for mode in (QuickSort.INTROSORT, QuickSort.THREE_WAY):
+            timings.append(min(timeit.repeat(
+                lambda: QuickSort(list(unsorted), mode=mode).run(),
+                number=1, repeat=3)))
+
+        print(f'{keys:>14} {timings[0]:>14.4f} {timings[1]:>14.4f} {timings[0] / timings[1]:>7.1f}x')
+
+
+def benchmark_parallel(size=4000000, max_workers=None):  # pragma: no cover
+    """ Prints the scaling curve of the parallel mode from 1 to max_workers processes """
+    max_workers = max_workers or os.cpu_count() or 1
+    rand = random.Random(size)
+    unsorted = typed_array('d', (rand.random() for _ in range(size)))
+    baseline = None
+
+    print(f'{"workers":>8} {"time (s)":>10} {"speedup":>8}')
+
+    for workers in range(1, max_workers + 1):
+        elapsed = min(timeit.repeat(
+            lambda: QuickSort(typed_array('d', unsorted), mode=QuickSort.PARALLEL,
+                              workers=workers).run(),
+            number=1, repeat=3))
+        baseline = baseline or elapsed
+
+        print(f'{workers:>8} {elapsed:>10.4f} {baseline / elapsed:>7.1f}x')
+
+
 def main():
     """ Main function """
 
@@ -82,6 +793,15 @@ def main():
 
     print(f'Sorted Array in Ascending Order: {qci.data}')
 
+    # Introsort instance, safe for already sorted input
+    qci = QuickSort(list(range(5000)), mode=QuickSort.INTROSORT)
+    qci.run()
+
+    print(f'Introsort on 5000 sorted elements, last five: {qci.data[-5:]}')
+
+    benchmark_three_way()
+    benchmark_parallel()
+
 
 if __name__ == "__main__":
     main()
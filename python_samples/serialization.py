@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+""" Contains helpers for serializing linked lists and trees to a compact binary format """
+
+__package_name__ = "python_samples"
+__authors__ = "Marco Espinosa"
+__license__ = "MIT License"
+__version__ = "1.0"
+__maintainer__ = "Marco Espinosa"
+__email__ = "hi@marcoespinosa.es"
+__status__ = "Development"
+
+from array import array
+import pickle
+import struct
+import sys
+
+from python_samples.binary_tree import AVLTreeNode, BinaryTreeNode, PersistentTreeNode
+from python_samples.custom_linked_list import CustomLinkedList
+
+# Header layout: magic, structure code, flags, values encoding,
+# number of values and length of the tree shape
+HEADER = struct.Struct('<4sBBcQQ')
+MAGIC = b'PYSD'
+
+# Supported structures
+STRUCTURES = {
+    1: CustomLinkedList,
+    2: BinaryTreeNode,
+    3: AVLTreeNode,
+    4: PersistentTreeNode,
+}
+STRUCTURE_CODES = {cls: code for (code, cls) in STRUCTURES.items()}
+
+# Linked list flags
+DOUBLY = 1
+INDEXED = 2
+
+# Values encodings: raw little-endian 64-bit integers or floats, or a pickled list
+INTEGERS = b'q'
+FLOATS = b'd'
+PICKLED = b'p'
+
+
+def _encode_values(values: list):
+    """
+    Encodes a list of values. Homogeneous integer or float values are
+    copied as a raw array, any other list is pickled.
+    Returns the encoding and the encoded bytes.
+    """
+    typecode = None
+    if values and all(type(value) is int for value in values):
+        typecode = INTEGERS
+    elif values and all(type(value) is float for value in values):
+        typecode = FLOATS
+
+    if typecode is not None:
+        try:
+            encoded = array(typecode.decode(), values)
+        except OverflowError:
+            # Integers out of 64 bits are pickled
+            pass
+        else:
+            if sys.byteorder == 'big':  # pragma: no cover
+                encoded.byteswap()
+            return (typecode, encoded.tobytes())
+
+    return (PICKLED, pickle.dumps(values, protocol=pickle.HIGHEST_PROTOCOL))
+
+
+def _decode_values(encoding: bytes, payload) -> list:
+    """ Decodes a list of values encoded by _encode_values """
+    if encoding == PICKLED:
+        return pickle.loads(payload)
+
+    values = array(encoding.decode())
+    values.frombytes(payload)
+    if sys.byteorder == 'big':  # pragma: no cover
+        values.byteswap()
+
+    return values.tolist()
+
+
+def dumps(structure) -> bytes:
+    """
+    Serializes a CustomLinkedList or a tree of BinaryTreeNode (or one of
+    its subclasses) to bytes. Nodes are flattened into an array of values,
+    plus the shape of the tree, so deep structures are serialized without
+    recursion. Other structures can be serialized with pickle.
+    """
+    code = STRUCTURE_CODES.get(type(structure))
+    if code is None:
+        raise TypeError(f"{type(structure).__name__} can not be serialized!")
+
+    if isinstance(structure, CustomLinkedList):
+        values = [node.data for node in structure]
+        shape = b''
+        flags = (DOUBLY if structure.doubly else 0) | (INDEXED if structure.indexed else 0)
+    else:
+        (values, shape) = structure.flatten()
+        flags = 0
+
+    (encoding, payload) = _encode_values(values)
+    header = HEADER.pack(MAGIC, code, flags, encoding, len(values), len(shape))
+
+    return b''.join((header, shape, payload))
+
+
+def loads(data):
+    """ Deserializes a structure serialized by dumps """
+    view = memoryview(data)
+    if len(view) < HEADER.size:
+        raise ValueError("The data is too short!")
+
+    (magic, code, flags, encoding, count, shape_length) = HEADER.unpack_from(view)
+    if magic != MAGIC or code not in STRUCTURES:
+        raise ValueError("The data was not serialized by dumps!")
+
+    shape = bytes(view[HEADER.size:HEADER.size + shape_length])
+    values = _decode_values(encoding, view[HEADER.size + shape_length:])
+    if len(values) != count:
+        raise ValueError("The data is corrupted!")
+
+    cls = STRUCTURES[code]
+    if cls is CustomLinkedList:
+        return cls(values, doubly=bool(flags & DOUBLY), indexed=bool(flags & INDEXED))
+
+    return cls.from_flat(values, shape)
@@ -1,4 +1,8 @@
 """ Test for algorithms methods """
+import random
+
+import pytest
+
 from python_samples.algorithms import *
 
 def test_swap_dict_a_b_values():
@@ -27,3 +31,103 @@ def test_search_employees_manager():
 
     assert search_employees_manager('mary', managers) == 'Tom'
     assert search_employees_manager('gary', managers) is None
+
+
+def test_employee_directory():
+    """ Managers are looked up in the precomputed index """
+    managers = {
+        'Tom': ['Mary', 'Paul'],
+        'Pepe': ['Juan', 'Mary'],
+        'John': ['Truman', 'Ana', 'Atos'],
+    }
+    directory = EmployeeDirectory(managers)
+
+    assert len(directory) == 6
+    for name in ('mary', ' ANA ', 'juan', 'gary'):
+        assert directory.manager_of(name) == search_employees_manager(name, managers)
+    assert 'paul' in directory
+    assert directory.employees_of('Pepe') == ['Juan']
+
+
+def test_employee_directory_changes():
+    """ Employees can be added, moved and removed """
+    directory = EmployeeDirectory({'Tom': ['Mary', 'Paul']})
+
+    directory.add_employee('Gary', 'Ana')
+    assert directory.manager_of('gary') == 'Ana'
+
+    directory.move_employee('mary', 'Ana')
+    assert directory.manager_of('Mary') == 'Ana'
+    assert directory.employees_of('Ana') == ['Gary', 'Mary']
+    assert directory.employees_of('Tom') == ['Paul']
+
+    assert directory.remove_employee('paul') == 'Tom'
+    assert directory.manager_of('Paul') is None
+    assert len(directory) == 2
+
+    with pytest.raises(ValueError):
+        directory.add_employee('gary', 'Tom')
+    with pytest.raises(KeyError):
+        directory.move_employee('Paul', 'Tom')
+    with pytest.raises(KeyError):
+        directory.remove_employee('Paul')
+
+
+def test_employee_directory_batch():
+    """ Many names are looked up at once """
+    managers = {'Tom': ['Mary', 'Paul'], 'Pepe': ['Juan']}
+    directory = EmployeeDirectory(managers)
+    names = ['mary', ' JUAN', 'gary', 'Paul']
+
+    assert directory.managers_of(names) == [search_employees_manager(name, managers)
+                                            for name in names]
+
+
+def test_employee_directory_org_chart():
+    """ Management chains and lowest common managers """
+    directory = EmployeeDirectory({
+        'Ceo': ['Tom', 'Pepe'],
+        'Tom': ['Mary', 'Paul'],
+        'Pepe': ['Juan'],
+        'Juan': ['Ana'],
+        'Other': ['Gary'],
+    })
+
+    assert directory.manager_chain('ana') == ['Juan', 'Pepe', 'Ceo']
+    assert directory.manager_chain('Ceo') == []
+    assert directory.manager_chain('nobody') == []
+    assert directory.lowest_common_manager('mary', 'paul') == 'Tom'
+    assert directory.lowest_common_manager('ana', 'Mary') == 'Ceo'
+    assert directory.lowest_common_manager('Pepe', 'ana') == 'Pepe'
+    assert directory.lowest_common_manager('ana', 'gary') is None
+    assert directory.lowest_common_manager('ana', 'nobody') is None
+
+    # Cached tables are rebuilt after changes
+    directory.move_employee('Juan', 'Tom')
+    assert directory.manager_chain('ana') == ['Juan', 'Tom', 'Ceo']
+    assert directory.lowest_common_manager('ana', 'Mary') == 'Tom'
+    directory.remove_employee('ana')
+    assert directory.manager_chain('ana') == []
+
+    # Ceo reporting to Juan closes a cycle
+    directory.add_employee('Ceo', 'Juan')
+    with pytest.raises(ValueError):
+        directory.manager_chain('mary')
+
+
+def test_employee_directory_deep_org_chart():
+    """ Binary lifting agrees with walking the management chains """
+    rand = random.Random(5)
+    managers = {}
+    for number in range(1, 2000):
+        # Mostly long chains, with some branches
+        manager = number - 1 if rand.random() < 0.9 else rand.randrange(number)
+        managers.setdefault(f'E{manager}', []).append(f'E{number}')
+    directory = EmployeeDirectory(managers)
+
+    for _ in range(200):
+        (name_a, name_b) = (f'E{rand.randrange(2000)}', f'E{rand.randrange(2000)}')
+        chain_a = [name_a.title()] + directory.manager_chain(name_a)
+        chain_b = [name_b.title()] + directory.manager_chain(name_b)
+        expected = next(manager for manager in chain_b if manager in chain_a)
+        assert directory.lowest_common_manager(name_a, name_b) == expected
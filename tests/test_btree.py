@@ -1,5 +1,11 @@
 """ Test for algorithms methods """
-from python_samples.binary_tree import BinaryTreeNode
+import pickle
+import random
+
+import pytest
+
+from python_samples.binary_tree import (AVLTreeNode, BinaryTreeNode, CompactBinaryTree,
+                                        PersistentTreeNode)
 
 
 def get_btree_sample() -> BinaryTreeNode:
@@ -110,3 +116,261 @@ def test_post_order_traversal():
     expect_result = [3, 25, 56, 35]
 
     assert expect_result == root.post_order_traversal(root)
+
+
+def check_avl_node(node) -> int:
+    """ Method that checks the AVL invariants and returns the subtree height """
+    if node is None:
+        return 0
+
+    left_height = check_avl_node(node.left_child)
+    right_height = check_avl_node(node.right_child)
+
+    assert abs(left_height - right_height) <= 1
+    assert node.height == 1 + max(left_height, right_height)
+
+    return node.height
+
+
+def test_avl_increasing_insertion():
+    """ Increasing values do not degrade the balanced tree into a list """
+    root = AVLTreeNode(0)
+    for value in range(1, 5000):
+        root.insert(value)
+
+    assert check_avl_node(root) <= 14
+    assert list(range(5000)) == root.in_order_traversal(root)
+    assert root.search(root, 4999) is True
+    assert root.search(root, 5000) is False
+
+
+def test_avl_random_insertion_and_deletion():
+    """ The tree stays balanced and ordered through inserts and deletes """
+    rand = random.Random(41)
+    values = rand.sample(range(10000), 2000)
+    root = AVLTreeNode(None)
+    for value in values:
+        root.insert(value)
+
+    removed = set(values[:1500])
+    for value in values[:1500]:
+        root.delete(value)
+    root.delete(-1)
+
+    check_avl_node(root)
+    assert sorted(set(values) - removed) == root.in_order_traversal(root)
+    assert root.search(root, values[0]) is False
+
+
+def test_avl_delete_until_empty():
+    """ Deleting the root keeps the root node usable """
+    root = AVLTreeNode(10)
+    root.insert(5)
+    root.delete(10)
+    assert [5] == root.in_order_traversal(root)
+
+    root.delete(5)
+    assert root.data is None
+    assert 0 == len(root)
+    assert [] == list(root)
+    assert [] == root.in_order_traversal(root)
+    assert [] == root.pre_order_traversal(root)
+    assert [] == root.post_order_traversal(root)
+    assert [] == list(pickle.loads(pickle.dumps(root)))
+    assert [] == list(PersistentTreeNode(None))
+    assert [] == list(pickle.loads(pickle.dumps(PersistentTreeNode(None))))
+
+    root.insert(7)
+    assert [7] == root.in_order_traversal(root)
+
+
+def test_lazy_traversals():
+    """ Iterators yield the same values as the list traversals """
+    root = get_btree_sample()
+    root.insert(30)
+    root.insert(60)
+
+    assert root.in_order_traversal(root) == list(root.iter_in_order()) == list(root)
+    assert root.pre_order_traversal(root) == list(root.iter_pre_order())
+    assert root.post_order_traversal(root) == list(root.iter_post_order())
+
+
+def test_lazy_traversals_deep_tree():
+    """ Skewed trees deeper than the recursion limit can be traversed """
+    root = BinaryTreeNode(0)
+    node = root
+    for value in range(1, 20000):
+        node.right_child = BinaryTreeNode(value)
+        node = node.right_child
+
+    assert list(range(20000)) == root.in_order_traversal(root)
+    assert list(range(20000)) == root.pre_order_traversal(root)
+    assert list(range(19999, -1, -1)) == root.post_order_traversal(root)
+
+    # Early exit
+    iterator = iter(root)
+    assert [0, 1, 2] == [next(iterator) for _ in range(3)]
+
+
+def test_from_sorted():
+    """ Bulk-loading sorted values builds a balanced tree """
+    root = AVLTreeNode.from_sorted(range(1000))
+
+    assert isinstance(root, AVLTreeNode)
+    assert check_avl_node(root) == 10
+    assert list(range(1000)) == list(root)
+
+    # The balanced tree can keep growing
+    root.insert(1000)
+    check_avl_node(root)
+    assert root.search(root, 1000) is True
+
+
+def test_from_iterable():
+    """ Bulk-loading unsorted values with duplicates """
+    root = BinaryTreeNode.from_iterable([5, 3, 9, 3, 1, 9])
+
+    assert [1, 3, 5, 9] == root.in_order_traversal(root)
+    assert [3, 1, 5, 9] == root.pre_order_traversal(root)
+    assert BinaryTreeNode.from_iterable([]).data is None
+
+
+def test_from_sorted_unsorted_values():
+    """ Unsorted values raise a ValueError """
+    with pytest.raises(ValueError):
+        BinaryTreeNode.from_sorted([1, 3, 2])
+
+
+def test_nodes_use_slots():
+    """ Nodes do not carry a __dict__ """
+    assert not hasattr(BinaryTreeNode(1), '__dict__')
+    assert not hasattr(AVLTreeNode(1), '__dict__')
+
+
+@pytest.mark.parametrize("typecode", [None, 'q'])
+def test_compact_tree_same_api(typecode):
+    """ The array-backed tree behaves as the node based one """
+    root = CompactBinaryTree(35, typecode=typecode)
+    for value in (25, 3, 56, 25):
+        root.insert(value)
+
+    assert 4 == len(root)
+    assert '35' == str(root)
+    assert root.search(root, 3) is True
+    assert root.search(root, 10) is False
+    assert [3, 25, 35, 56] == root.in_order_traversal(root) == list(root)
+    assert [35, 25, 3, 56] == root.pre_order_traversal(root)
+    assert [3, 25, 56, 35] == root.post_order_traversal(root)
+
+
+def test_compact_tree_empty():
+    """ An empty compact tree """
+    root = CompactBinaryTree()
+
+    assert root.data is None
+    assert root.search(root, 1) is False
+    assert [] == root.in_order_traversal(root) == root.post_order_traversal(root)
+
+    root.insert('Joe')
+    root.insert('Alice')
+    assert ['Alice', 'Joe'] == list(root)
+
+
+def test_range_iterator():
+    """ Range queries prune the subtrees out of the bounds """
+    root = get_btree_sample()
+
+    assert [25, 35] == list(root.range(4, 35))
+    assert [3, 25, 35, 56] == list(root.range(0, 100))
+    assert [] == list(root.range(57, 100))
+    assert [] == list(BinaryTreeNode(None).range(0, 1))
+
+
+def test_order_statistics():
+    """ Rank, select and count range match a sorted list """
+    rand = random.Random(43)
+    values = rand.sample(range(100000), 3000)
+    root = AVLTreeNode(None)
+    for value in values:
+        root.insert(value)
+    for value in values[:1000]:
+        root.delete(value)
+
+    expected = sorted(values[1000:])
+    assert len(expected) == len(root)
+
+    for _ in range(200):
+        (low, high) = sorted(rand.sample(range(100000), 2))
+        in_range = [value for value in expected if low <= value <= high]
+
+        assert sum(value < low for value in expected) == root.rank(low)
+        assert len(in_range) == root.count_range(low, high)
+        assert in_range == list(root.range(low, high))
+
+    for index in (0, 1, 999, 1999):
+        assert expected[index] == root.select(index)
+
+    with pytest.raises(IndexError):
+        root.select(2000)
+
+
+def test_order_statistics_empty_tree():
+    """ Order statistics of an empty tree """
+    root = AVLTreeNode(None)
+
+    assert 0 == len(root)
+    assert 0 == root.rank(10)
+    assert 0 == root.count_range(0, 10)
+    assert 0 == AVLTreeNode.from_sorted([1, 2, 3]).count_range(3, 1)
+
+
+def test_search_empty_tree():
+    """ Searching a tree without data """
+    root = BinaryTreeNode(None)
+    assert root.search(root, 10) is False
+
+
+def test_persistent_insert_keeps_snapshots():
+    """ Inserting returns a new version and old versions do not change """
+    versions = [PersistentTreeNode(None)]
+    for value in range(1, 200):
+        versions.append(versions[-1].insert(value))
+
+    for (size, root) in enumerate(versions[1:], start=1):
+        assert list(range(1, size + 1)) == list(root)
+
+    # Balanced whatever the insertion order is
+    assert versions[-1].height <= 9
+    assert versions[10].search(versions[10], 11) is False
+    assert versions[11].search(versions[11], 11) is True
+
+
+def test_persistent_insert_shares_subtrees():
+    """ Untouched subtrees are shared between versions """
+    old_root = PersistentTreeNode.from_sorted(range(0, 100, 2))
+    new_root = old_root.insert(99)
+
+    assert new_root is not old_root
+    assert new_root.left_child is old_root.left_child
+    assert new_root.right_child is not old_root.right_child
+    assert 99 not in list(old_root)
+
+    # Duplicated values return the same version
+    assert new_root.insert(50) is new_root
+
+
+def test_search_many():
+    """ Batched search returns the membership of each key, in order """
+    rand = random.Random(53)
+    values = rand.sample(range(10000), 3000)
+    root = AVLTreeNode(None)
+    for value in values:
+        root.insert(value)
+
+    keys = [rand.randrange(-10, 10010) for _ in range(2000)] + values[:10]
+    expected = [root.search(root, key) for key in keys]
+
+    assert expected == root.search_many(keys)
+    assert [True, False, True] == get_btree_sample().search_many([3, 4, 3])
+    assert [False] == BinaryTreeNode(None).search_many([1])
+    assert [] == get_btree_sample().search_many([])
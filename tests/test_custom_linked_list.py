@@ -0,0 +1,503 @@
+""" Test for the custom linked list """
+import io
+import queue
+import random
+import threading
+import time
+
+import pytest
+
+from python_samples.custom_linked_list import (ConcurrentLinkedList, CustomLinkedList,
+                                               NodeNotFoundException, SkipList,
+                                               UnrolledLinkedList)
+
+
+def values(custom_list) -> list:
+    """ Method that returns the data of the list nodes """
+    return [node.data for node in custom_list]
+
+
+def check_links(custom_list) -> None:
+    """ Method that checks the tail, the size and the previous pointers """
+    nodes = list(custom_list)
+
+    assert len(nodes) == len(custom_list)
+    assert custom_list.tail is (nodes[-1] if nodes else None)
+
+    if custom_list.doubly:
+        previous_nodes = [None] + nodes[:-1]
+        assert all(node.prev is previous for (node, previous) in zip(nodes, previous_nodes))
+
+    if custom_list.indexed:
+        assert all(node._label < next_node._label for (node, next_node) in zip(nodes, nodes[1:]))
+        duplicates = {}
+        for node in nodes:
+            duplicates.setdefault(node.data, []).append(node)
+        assert duplicates == {data: indexed_nodes(custom_list, data) for data in custom_list._index}
+
+
+def indexed_nodes(custom_list, data) -> list:
+    """ Method that returns the indexed nodes of a value, following their links """
+    (node, last) = custom_list._index[data]
+    nodes = [node]
+    while node._next_same is not None:
+        assert node._next_same._prev_same is node
+        node = node._next_same
+        nodes.append(node)
+
+    assert nodes[-1] is last
+    return nodes
+
+
+def test_constructor_does_not_modify_input():
+    """ The constructor copies the given list """
+    nodes = ['3', '1', '2']
+    custom_list = CustomLinkedList(nodes)
+
+    assert ['3', '1', '2'] == nodes
+    assert nodes == values(custom_list)
+    assert 0 == len(CustomLinkedList())
+
+
+@pytest.mark.parametrize("doubly", [False, True])
+def test_add_nodes(doubly):
+    """ Every insertion keeps the tail and the size up to date """
+    custom_list = CustomLinkedList(doubly=doubly)
+    custom_list.add_last('b')
+    custom_list.add_first('a')
+    custom_list.add_last('d')
+    custom_list.add_after('b', 'c')
+    custom_list.add_after('d', 'e')
+    custom_list.add_before('a', '0')
+
+    assert ['0', 'a', 'b', 'c', 'd', 'e'] == values(custom_list)
+    check_links(custom_list)
+
+    with pytest.raises(NodeNotFoundException):
+        custom_list.add_before('z', 'y')
+
+
+@pytest.mark.parametrize("doubly", [False, True])
+def test_pop_and_reversed(doubly):
+    """ The list can be used as a queue from both ends """
+    custom_list = CustomLinkedList([1, 2, 3, 4], doubly=doubly)
+
+    assert [4, 3, 2, 1] == [node.data for node in reversed(custom_list)]
+    assert 4 == custom_list.pop_last()
+    assert 1 == custom_list.pop_first()
+    check_links(custom_list)
+
+    assert 3 == custom_list.pop_last()
+    assert 2 == custom_list.pop_last()
+    check_links(custom_list)
+
+    with pytest.raises(IndexError):
+        custom_list.pop_first()
+    with pytest.raises(IndexError):
+        custom_list.pop_last()
+
+
+@pytest.mark.parametrize("doubly", [False, True])
+def test_sort(doubly):
+    """ Sorting keeps the tail and the previous pointers """
+    custom_list = CustomLinkedList([5, 3, 9, 1, 3], doubly=doubly)
+    custom_list.sort()
+
+    assert [1, 3, 3, 5, 9] == values(custom_list)
+    check_links(custom_list)
+
+    custom_list.add_last(10)
+    assert 10 == custom_list.tail.data
+
+
+def test_indexed_mode():
+    """ The index stays consistent through insertions, removals and sort """
+    custom_list = CustomLinkedList([5, 3, 9], indexed=True)
+    custom_list.add_after(3, 4)
+    custom_list.add_before(5, 1)
+    custom_list.add_last(3)
+    custom_list.add_first(7)
+
+    assert [7, 1, 5, 3, 4, 9, 3] == values(custom_list)
+    assert 3 in custom_list
+    assert 8 not in custom_list
+
+    custom_list.sort()
+    custom_list.add_after(9, 10)
+    custom_list.add_before(1, 0)
+    assert [0, 1, 3, 3, 4, 5, 7, 9, 10] == values(custom_list)
+
+    custom_list.remove(3)
+    custom_list.remove(3)
+    custom_list.remove(10)
+    assert 3 not in custom_list
+    assert [0, 1, 4, 5, 7, 9] == values(custom_list)
+    check_links(custom_list)
+
+    assert sorted(custom_list._index) == values(custom_list)
+    with pytest.raises(NodeNotFoundException):
+        custom_list.remove(3)
+
+
+def test_indexed_mode_duplicates():
+    """ The first node in the list is targeted, as without the index """
+    indexed_list = CustomLinkedList(['x', 'y'], indexed=True)
+    plain_list = CustomLinkedList(['x', 'y'])
+    assert indexed_list.doubly
+
+    rand = random.Random(37)
+    for _ in range(300):
+        (operation, data, new_data) = (rand.randrange(6), rand.choice('xyz'), rand.choice('xyzw'))
+        for custom_list in (indexed_list, plain_list):
+            if operation == 0:
+                custom_list.add_first(data)
+            elif operation == 1:
+                custom_list.add_last(data)
+            elif data in custom_list:
+                if operation == 2:
+                    custom_list.add_after(data, new_data)
+                elif operation == 3:
+                    custom_list.add_before(data, new_data)
+                else:
+                    custom_list.remove(data)
+
+        assert values(plain_list) == values(indexed_list)
+        check_links(indexed_list)
+
+
+def test_indexed_mode_many_duplicates():
+    """ Nodes of a duplicated value are unlinked in O(1) """
+    custom_list = CustomLinkedList([1] * 100000, indexed=True)
+    for _ in range(100000):
+        custom_list.pop_last()
+
+    assert 1 not in custom_list
+    assert 0 == len(custom_list)
+
+
+def test_indexed_mode_duplicates_time():
+    """ Duplicated values are targeted and inserted without walking the list """
+    size = 100000
+    custom_list = CustomLinkedList(range(size), indexed=True)
+    start = time.perf_counter()
+
+    for value in range(2000):
+        custom_list.add_first(5)
+        custom_list.add_after(5, -value)
+    for _ in range(200):
+        custom_list.add_before(size // 2, 7)
+        custom_list.remove(7)
+    # Between the first two nodes of a duplicated value, so labels get crowded
+    for _ in range(2000):
+        custom_list.add_after(5, 5)
+    # After the last node of a duplicated value, far from the others
+    for _ in range(2000):
+        custom_list.add_before(size // 2, 5)
+    for _ in range(6000):
+        custom_list.remove(5)
+
+    assert time.perf_counter() - start < 2
+    # The first 7 and 5 were removed, the last 7 and 5 inserted are left
+    expected = list(range(-1999, 1)) + [0, 1, 2, 3, 4, 6] + list(range(8, size // 2)) + [7, 5] + \
+        list(range(size // 2, size))
+    assert expected == values(custom_list)
+    check_links(custom_list)
+
+
+def test_contains_and_remove_without_index():
+    """ Membership and removal scan the list without an index """
+    custom_list = CustomLinkedList(['a', 'b', 'a'])
+    custom_list.remove('a')
+
+    assert 'a' in custom_list
+    assert ['b', 'a'] == values(custom_list)
+    check_links(custom_list)
+
+
+def check_unrolled(unrolled, expected, capacity) -> None:
+    """ Method that checks the content and the shape of an unrolled list """
+    nodes = list(unrolled._nodes())
+
+    assert expected == list(unrolled.values())
+    assert expected == values(unrolled)
+    assert len(expected) == len(unrolled)
+    assert unrolled.tail is (nodes[-1] if nodes else None)
+    assert all(0 < len(node.values) <= capacity for node in nodes)
+
+
+def test_unrolled_list_same_api():
+    """ The unrolled list behaves as a list of values """
+    rand = random.Random(59)
+    unrolled = UnrolledLinkedList(range(20), capacity=4)
+    expected = list(range(20))
+
+    for value in range(100, 160):
+        target = rand.choice(expected)
+        if value % 3 == 0:
+            unrolled.add_after(target, value)
+            expected.insert(expected.index(target) + 1, value)
+        elif value % 3 == 1:
+            unrolled.add_before(target, value)
+            expected.insert(expected.index(target), value)
+        else:
+            unrolled.add_first(value)
+            unrolled.add_last(-value)
+            expected = [value] + expected + [-value]
+
+        check_unrolled(unrolled, expected, 4)
+
+    for value in rand.sample(expected, len(expected) - 5):
+        unrolled.remove(value)
+        expected.remove(value)
+        check_unrolled(unrolled, expected, 4)
+
+    unrolled.sort()
+    check_unrolled(unrolled, sorted(expected), 4)
+    assert expected[0] in unrolled
+    assert 1000 not in unrolled
+
+    with pytest.raises(NodeNotFoundException):
+        unrolled.add_after(1000, 1)
+
+
+def test_unrolled_list_items():
+    """ Iterating yields items with the data accessors of a node """
+    unrolled = UnrolledLinkedList(range(10), capacity=4)
+    for item in unrolled:
+        item.data *= 2
+
+    assert list(range(0, 20, 2)) == list(unrolled.values())
+    assert '4' == repr(list(unrolled)[2])
+
+
+def test_unrolled_list_remove_all():
+    """ Removing every value leaves an empty list """
+    unrolled = UnrolledLinkedList(['a', 'b', 'c'], capacity=2)
+    for value in ('b', 'a', 'c'):
+        unrolled.remove(value)
+
+    check_unrolled(unrolled, [], 2)
+    assert 'None' == repr(unrolled)
+
+    unrolled.add_first('z')
+    check_unrolled(unrolled, ['z'], 2)
+
+
+@pytest.mark.parametrize("doubly", [False, True])
+def test_sort_key_and_reverse(doubly):
+    """ Sorting by key is stable in both directions """
+    rand = random.Random(61)
+    records = [(rand.randrange(10), i) for i in range(500)]
+
+    for reverse in (False, True):
+        custom_list = CustomLinkedList(records, doubly=doubly)
+        custom_list.sort(key=lambda record: record[0], reverse=reverse)
+
+        assert sorted(records, key=lambda record: record[0], reverse=reverse) == values(custom_list)
+        check_links(custom_list)
+
+
+def test_sort_long_nearly_sorted_list():
+    """ Long lists are sorted without recursion """
+    data = list(range(100000))
+    data[500], data[90000] = data[90000], data[500]
+    custom_list = CustomLinkedList(data)
+    custom_list.sort()
+
+    assert list(range(100000)) == values(custom_list)
+
+
+def test_sort_error():
+    """ Values that can not be compared raise a TypeError """
+    custom_list = CustomLinkedList([1, 'a', 2])
+
+    with pytest.raises(TypeError):
+        custom_list.sort()
+    check_links(custom_list)
+
+
+class Comparable:
+    """ Value comparing as less than or equal to, and greater than, any other value """
+
+    def __le__(self, other):
+        return True
+
+    def __ge__(self, other):
+        return True
+
+    def __gt__(self, other):
+        return True
+
+
+@pytest.mark.parametrize("unsorted", [
+    # Fails while splitting the list in runs
+    [3, 1, 2, 'a', 5, 4],
+    # Fails while merging the runs ['b'], ['a', any, 2] and [1]
+    ['b', 'a', Comparable(), 2, 1],
+])
+def test_sort_error_keeps_nodes(unsorted):
+    """ No node is lost, nor left in the index, when the sort fails """
+    custom_list = CustomLinkedList(unsorted, indexed=True)
+
+    with pytest.raises(TypeError):
+        custom_list.sort()
+
+    check_links(custom_list)
+    assert sorted(map(id, unsorted)) == sorted(id(value) for value in values(custom_list))
+    assert sorted(map(id, unsorted)) == sorted(id(node.data) for data in custom_list._index
+                                               for node in indexed_nodes(custom_list, data))
+    custom_list.add_after(unsorted[-1], 'new')
+    assert 'new' in values(custom_list)
+
+
+@pytest.mark.parametrize("probability", [0.25, 0.5])
+def test_skip_list(probability):
+    """ The skip list keeps its nodes sorted on every insert """
+    rand = random.Random(67)
+    data = [rand.randrange(1000) for _ in range(2000)]
+    skip_list = SkipList(data[:1000], probability=probability, max_level=12, seed=1)
+    for value in data[1000:]:
+        skip_list.insert(value)
+
+    assert sorted(data) == values(skip_list)
+    assert len(data) == len(skip_list)
+    assert data[0] in skip_list
+    assert 1000 not in skip_list
+
+    for value in data[:1500]:
+        skip_list.remove(value)
+    expected = sorted(data[1500:])
+
+    assert expected == values(skip_list)
+    assert [value for value in expected if 100 <= value <= 300] == \
+        [node.data for node in skip_list.range(100, 300)]
+
+    with pytest.raises(NodeNotFoundException):
+        skip_list.remove(1000)
+
+
+def test_skip_list_parameters():
+    """ Invalid parameters raise a ValueError """
+    with pytest.raises(ValueError):
+        SkipList(probability=1)
+    with pytest.raises(ValueError):
+        SkipList(max_level=0)
+
+    skip_list = SkipList(['b', 'c', 'a'], max_level=1)
+    skip_list.sort()
+    assert 'a -> b -> c -> None' == repr(skip_list)
+
+
+@pytest.mark.parametrize("doubly", [False, True])
+def test_streaming_construction(doubly):
+    """ Lists are built from generators in a single pass """
+    custom_list = CustomLinkedList((value * 2 for value in range(5)), doubly=doubly, indexed=True)
+    custom_list.extend(iter([10, 12]))
+
+    assert [0, 2, 4, 6, 8, 10, 12] == values(custom_list)
+    assert 12 in custom_list
+    check_links(custom_list)
+
+
+def test_extend_failing_iterable():
+    """ The list stays consistent if the iterable raises an error """
+    def generator():
+        yield 1
+        yield 2
+        raise RuntimeError("Broken generator")
+
+    custom_list = CustomLinkedList([0])
+    with pytest.raises(RuntimeError):
+        custom_list.extend(generator())
+
+    assert [0, 1, 2] == values(custom_list)
+    check_links(custom_list)
+
+
+def test_extend_unhashable_value():
+    """ The indexed list stays consistent if a value can not be indexed """
+    custom_list = CustomLinkedList([1, 2], indexed=True)
+    with pytest.raises(TypeError):
+        custom_list.extend([3, [4]])
+    with pytest.raises(TypeError):
+        custom_list.add_first([0])
+
+    assert [1, 2, 3] == values(custom_list)
+    assert 3 == custom_list.tail.data
+    check_links(custom_list)
+
+
+def test_chunked_rendering():
+    """ The representation is rendered in chunks """
+    custom_list = CustomLinkedList(range(5))
+    stream = io.StringIO()
+    custom_list.write_to(stream, chunk_size=2)
+
+    assert ['0 -> 1 -> ', '2 -> 3 -> ', '4 -> None'] == list(custom_list.iter_repr(2))
+    assert '0 -> 1 -> 2 -> 3 -> 4 -> None' == stream.getvalue() == repr(custom_list)
+    assert 'None' == repr(CustomLinkedList())
+
+
+def test_concurrent_list():
+    """ Values are popped in FIFO order and an empty list raises queue.Empty """
+    concurrent_list = ConcurrentLinkedList([1, 2])
+    concurrent_list.add_last(None)
+    concurrent_list.add_last(3)
+
+    assert 4 == len(concurrent_list)
+    assert [1, 2, None, 3] == [concurrent_list.pop_first() for _ in range(4)]
+    assert 0 == len(concurrent_list)
+    with pytest.raises(queue.Empty):
+        concurrent_list.pop_first(block=False)
+    with pytest.raises(queue.Empty):
+        concurrent_list.pop_first(timeout=0.01)
+    with pytest.raises(ValueError):
+        ConcurrentLinkedList(capacity=-1)
+
+
+def test_concurrent_list_capacity():
+    """ A full list raises queue.Full or waits for a consumer """
+    concurrent_list = ConcurrentLinkedList([1, 2], capacity=2)
+
+    with pytest.raises(queue.Full):
+        concurrent_list.add_last(3, block=False)
+    with pytest.raises(queue.Full):
+        concurrent_list.add_last(3, timeout=0.01)
+
+    producer = threading.Thread(target=concurrent_list.add_last, args=(3,))
+    producer.start()
+    assert 1 == concurrent_list.pop_first()
+    producer.join(timeout=5)
+
+    assert not producer.is_alive()
+    assert [2, 3] == [concurrent_list.pop_first(block=False) for _ in range(2)]
+
+
+def test_concurrent_list_threads():
+    """ Every value added by the producers is popped exactly once """
+    concurrent_list = ConcurrentLinkedList(capacity=16)
+    (producers, consumers, count) = (4, 4, 2000)
+    popped = [[] for _ in range(consumers)]
+
+    def produce(number):
+        for value in range(number * count, (number + 1) * count):
+            concurrent_list.add_last(value)
+
+    def consume(number):
+        for _ in range(count):
+            popped[number].append(concurrent_list.pop_first(timeout=10))
+
+    threads = [threading.Thread(target=produce, args=(number,)) for number in range(producers)]
+    threads += [threading.Thread(target=consume, args=(number,)) for number in range(consumers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert list(range(producers * count)) == sorted(sum(popped, []))
+    assert 0 == len(concurrent_list)
+    # Each consumer gets the values of a producer in order
+    for values_popped in popped:
+        for number in range(producers):
+            own = [value for value in values_popped if value // count == number]
+            assert own == sorted(own)
@@ -0,0 +1,106 @@
+""" Test for the disk-backed B-tree index """
+import random
+
+import pytest
+
+from python_samples.disk_btree import DiskBTree
+
+
+def test_insert_and_get(tmp_path):
+    """ Random inserts with small pages and a tiny cache split many pages """
+    rand = random.Random(47)
+    keys = rand.sample(range(-50000, 50000), 5000)
+
+    with DiskBTree(tmp_path / 'index.btree', page_size=128, cache_size=4) as tree:
+        for key in keys:
+            tree.insert(key, key * 2)
+        # Updating an existing key does not add it twice
+        tree.insert(keys[0], 7)
+
+        assert len(keys) == len(tree)
+        assert 7 == tree.get(keys[0])
+        assert keys[1] * 2 == tree.get(keys[1])
+        assert tree.get(50001) is None
+        assert keys[2] in tree
+        assert 50001 not in tree
+        assert sorted(keys) == list(tree)
+
+
+def test_reopen(tmp_path):
+    """ An index file can be reopened without rebuilding it """
+    path = tmp_path / 'index.btree'
+    with DiskBTree(path, page_size=256) as tree:
+        for key in range(1000, 0, -1):
+            tree.insert(key, -key)
+
+    with DiskBTree(path) as tree:
+        assert 1000 == len(tree)
+        assert -500 == tree.get(500)
+        assert [(10, -10), (11, -11), (12, -12)] == list(tree.items(10, 12))
+
+
+def test_bulk_load(tmp_path):
+    """ Bulk-loading sorted items builds a valid tree that can keep growing """
+    path = tmp_path / 'index.btree'
+    with DiskBTree.bulk_load(path, ((key, key + 1) for key in range(0, 20000, 2)), page_size=256) as tree:
+        assert 10000 == len(tree)
+        assert 5 == tree.get(4)
+        assert tree.get(5) is None
+
+        for key in range(1, 2000, 2):
+            tree.insert(key, key + 1)
+
+    with DiskBTree(path, cache_size=8) as tree:
+        assert 11000 == len(tree)
+        assert list(range(2000)) + list(range(2000, 20000, 2)) == list(tree)
+        assert [] == list(tree.items(20000, 30000))
+
+
+def test_bulk_load_unsorted(tmp_path):
+    """ Unsorted items raise a ValueError and do not leave a file """
+    path = tmp_path / 'index.btree'
+    with pytest.raises(ValueError):
+        DiskBTree.bulk_load(path, [(2, 0), (1, 0)])
+
+    assert not path.exists()
+
+
+def test_bulk_load_existing_file(tmp_path):
+    """ An existing file is only replaced on request """
+    path = tmp_path / 'index.btree'
+    path.write_bytes(b'precious data')
+
+    with pytest.raises(FileExistsError):
+        DiskBTree.bulk_load(path, [(1, 2)])
+    assert b'precious data' == path.read_bytes()
+
+    with DiskBTree.bulk_load(path, [(1, 2)], overwrite=True) as tree:
+        assert 2 == tree.get(1)
+
+
+def test_not_an_index_file(tmp_path):
+    """ Opening a file which is not an index raises a ValueError """
+    path = tmp_path / 'other.bin'
+    path.write_bytes(b'x' * 64)
+
+    with pytest.raises(ValueError):
+        DiskBTree(path)
+
+    # Shorter than the meta data
+    path.write_bytes(b'x' * 4)
+    with pytest.raises(ValueError):
+        DiskBTree(path)
+
+
+def test_invalid_page_size(tmp_path):
+    """ An invalid page size does not create the file """
+    path = tmp_path / 'index.btree'
+    with pytest.raises(ValueError):
+        DiskBTree(path, page_size=32)
+    # The number of keys of a page would not fit in the header
+    with pytest.raises(ValueError):
+        DiskBTree(path, page_size=1 << 21)
+
+    assert not path.exists()
+    with DiskBTree(path) as tree:
+        assert 0 == len(tree)
@@ -1,5 +1,14 @@
 """ Test for Quicksort algorithm """
-from python_samples.quick_sort import QuickSort
+from array import array
+import random
+import tracemalloc
+import types
+
+import pytest
+
+from python_samples import quick_sort
+from python_samples.quick_sort import QuickSort, external_sort
+
 
 def test_sorted_array_in_ascendant_order():
     """ Method to test the quicksort implementation.
@@ -13,4 +22,340 @@ def test_sorted_array_in_ascendant_order():
     qci.run()
 
     assert expected == qci.data
-    
\ No newline at end of file
+    
+
+def test_introsort_sorted_and_reverse_sorted_input():
+    """ Introsort must not hit the recursion limit on presorted arrays """
+
+    for unsorted in (list(range(5000)), list(range(5000, 0, -1))):
+        qci = QuickSort(unsorted, mode=QuickSort.INTROSORT)
+        qci.run()
+
+        assert sorted(unsorted) == qci.data
+
+
+def test_introsort_random_input():
+    """ Introsort has to match the builtin sort on random arrays """
+    rand = random.Random(7)
+
+    for size in (0, 1, 2, 15, 16, 17, 200, 3000):
+        unsorted = [rand.randint(-100, 100) for _ in range(size)]
+        expected = sorted(unsorted)
+
+        qci = QuickSort(unsorted, mode=QuickSort.INTROSORT)
+        qci.run()
+
+        assert expected == qci.data
+
+
+def test_introsort_heapsort_fallback():
+    """ Heapsort is used once the depth limit is reached """
+    rand = random.Random(3)
+    unsorted = [rand.random() for _ in range(500)]
+    expected = sorted(unsorted)
+
+    qci = QuickSort(unsorted, mode=QuickSort.INTROSORT)
+    qci._intro_sort(unsorted, 0, len(unsorted) - 1, 0)
+
+    assert expected == qci.data
+
+
+def test_unknown_mode():
+    """ An unknown mode raises a ValueError """
+    with pytest.raises(ValueError):
+        QuickSort([], mode="bogosort")
+
+
+def test_three_way_duplicate_heavy_input():
+    """ Three-way mode has to sort arrays with few distinct keys """
+    rand = random.Random(11)
+
+    for keys in (1, 2, 5, 1000):
+        unsorted = [rand.randrange(keys) for _ in range(3000)]
+        expected = sorted(unsorted)
+
+        qci = QuickSort(unsorted, mode=QuickSort.THREE_WAY)
+        qci.run()
+
+        assert expected == qci.data
+
+
+def test_partition_three_way_bands():
+    """ The equal band is returned by its first and last positions """
+    array = [3, 1, 3, 5, 3, 0, 3]
+    (first, last) = QuickSort._partition_three_way(array, 0, len(array) - 1)
+
+    assert array[first:last + 1] == [3, 3, 3, 3]
+    assert all(value < 3 for value in array[:first])
+    assert all(value > 3 for value in array[last + 1:])
+
+
+def test_sort_typed_array_in_place():
+    """ array.array instances are sorted in place """
+    rand = random.Random(5)
+    unsorted = array('d', (rand.random() for _ in range(2000)))
+    expected = sorted(unsorted)
+
+    qci = QuickSort(unsorted)
+    qci.run()
+
+    assert qci.data is unsorted
+    assert expected == list(unsorted)
+
+
+def test_sort_memoryview_in_place():
+    """ Writable memoryviews sort the underlying buffer """
+    buffer = array('q', [5, -3, 9, 0, 5, 2, -8])
+    expected = sorted(buffer)
+
+    qci = QuickSort(memoryview(buffer), mode=QuickSort.THREE_WAY)
+    qci.run()
+
+    assert expected == list(buffer)
+
+
+def test_sort_strided_memoryview():
+    """ Non-contiguous memoryviews only sort their own elements """
+    buffer = array('q', [9, 100, 4, 101, 7, 102, -1, 103])
+
+    QuickSort(memoryview(buffer)[::2]).run()
+
+    assert [-1, 100, 4, 101, 7, 102, 9, 103] == list(buffer)
+
+
+def test_sort_numpy_array_in_place():
+    """ NumPy arrays are sorted in place by the typed fast path """
+    numpy = pytest.importorskip("numpy")
+    unsorted = numpy.random.default_rng(1).random(5000)
+    expected = numpy.sort(unsorted)
+
+    qci = QuickSort(unsorted)
+    qci.run()
+
+    assert (expected == unsorted).all()
+
+
+@pytest.mark.parametrize("typed", [True, False])
+def test_parallel_mode(typed):
+    """ Parallel mode sorts numeric data through a process pool """
+    rand = random.Random(13)
+    values = [rand.randint(-10000, 10000) for _ in range(5000)]
+    unsorted = array('q', values) if typed else values
+
+    qci = QuickSort(unsorted, mode=QuickSort.PARALLEL, workers=2, parallel_cutoff=500)
+    qci.run()
+
+    assert sorted(values) == list(qci.data)
+    assert qci.data is unsorted
+
+
+def test_parallel_mode_without_numpy(monkeypatch):
+    """ Top levels are partitioned by the Python engine when NumPy is missing """
+    monkeypatch.setattr(quick_sort, "numpy", None)
+    rand = random.Random(17)
+    unsorted = [rand.random() for _ in range(3000)]
+    expected = sorted(unsorted)
+
+    qci = QuickSort(unsorted, mode=QuickSort.PARALLEL, workers=2, parallel_cutoff=300)
+    qci.run()
+
+    assert expected == qci.data
+
+
+def test_parallel_mode_fallbacks():
+    """ Data which can not be shared is sorted by the sequential introsort """
+    rand = random.Random(41)
+    values = [rand.randint(-1000, 1000) for _ in range(1000)]
+
+    # Strided buffer
+    buffer = array('q', values)
+    QuickSort(memoryview(buffer)[::2], mode=QuickSort.PARALLEL, workers=2, parallel_cutoff=100).run()
+    assert sorted(values[::2]) == list(buffer[::2])
+    assert values[1::2] == list(buffer[1::2])
+
+    # Integers out of the int64 range
+    big_values = values + [2 ** 70, -2 ** 70]
+    data = list(big_values)
+    QuickSort(data, mode=QuickSort.PARALLEL, workers=2, parallel_cutoff=100).run()
+    assert sorted(big_values) == data
+
+
+def test_parallel_mode_strided_numpy_array():
+    """ Strided NumPy arrays are sorted in place """
+    numpy = pytest.importorskip("numpy")
+    unsorted = numpy.random.default_rng(3).random(2000)
+    expected = numpy.sort(unsorted[::2])
+
+    QuickSort(unsorted[::2], mode=QuickSort.PARALLEL, workers=2, parallel_cutoff=100).run()
+
+    assert (expected == unsorted[::2]).all()
+
+
+def test_parallel_mode_rejects_mixed_data():
+    """ Only homogeneous numeric data can be shared between processes """
+    with pytest.raises(TypeError):
+        QuickSort([1, 2.5, "3"], mode=QuickSort.PARALLEL).run()
+
+
+def test_external_sort_iterable():
+    """ External sort spills runs to disk and merges them back """
+    rand = random.Random(19)
+    values = [rand.random() for _ in range(1000)]
+
+    # 100 doubles per run
+    result = external_sort(iter(values), memory_limit=800)
+
+    assert isinstance(result, types.GeneratorType)
+    assert sorted(values) == list(result)
+
+
+def test_external_sort_file(tmp_path):
+    """ External sort reads binary files of typed items """
+    rand = random.Random(23)
+    values = array('q', (rand.randint(-500, 500) for _ in range(777)))
+    path = tmp_path / 'values.bin'
+    with open(path, 'wb') as file_:
+        values.tofile(file_)
+
+    result = external_sort(path, memory_limit=8 * 50, typecode='q',
+                           mode=QuickSort.THREE_WAY, temp_dir=tmp_path)
+
+    assert sorted(values) == list(result)
+
+
+def test_external_sort_partial_item(tmp_path):
+    """ A file with a trailing partial item raises a ValueError """
+    path = tmp_path / 'values.bin'
+    path.write_bytes(array('q', [5, 1, 3]).tobytes() + b'xyz')
+
+    with pytest.raises(ValueError):
+        list(external_sort(path, typecode='q'))
+
+
+def test_external_sort_memory_limit():
+    """ Only a chunk of memory_limit bytes is held while spilling and no chunk while merging """
+    rand = random.Random(31)
+    memory_limit = 80000
+    size = 100000
+
+    tracemalloc.start()
+    try:
+        result = external_sort((rand.random() for _ in range(size)), memory_limit=memory_limit)
+        previous = next(result)
+        merging = tracemalloc.get_traced_memory()[0]
+        for value in result:
+            assert previous <= value
+            previous = value
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    assert merging < memory_limit / 4
+    assert peak < memory_limit * 1.25
+
+
+def test_external_sort_small_input():
+    """ Inputs that fit in one chunk and empty inputs """
+    assert [1.0, 2.0, 3.0] == list(external_sort([3, 1, 2]))
+    assert [] == list(external_sort([]))
+
+
+@pytest.mark.parametrize("mode", [QuickSort.CLASSIC, QuickSort.THREE_WAY])
+def test_select_and_nth_element(mode):
+    """ Selection returns the element of the sorted position """
+    rand = random.Random(29)
+    values = [rand.randint(0, 50) for _ in range(2000)]
+    expected = sorted(values)
+
+    for k in (0, 1, 999, 1999, -1):
+        assert expected[k] == QuickSort(list(values), mode=mode).select(k)
+
+    data = list(values)
+    QuickSort(data, mode=mode).nth_element(700)
+    assert expected[700] == data[700]
+    assert max(data[:700]) <= data[700] <= min(data[701:])
+
+
+def test_select_many_percentiles():
+    """ Several positions are selected in one pass """
+    values = list(range(1000, 0, -1))
+    qci = QuickSort(values)
+
+    assert [501, 1000, 1, 951] == qci.select_many([500, 999, 0, 950])
+
+
+def test_select_out_of_range():
+    """ Positions out of the array raise an IndexError """
+    with pytest.raises(IndexError):
+        QuickSort([1, 2, 3]).select(3)
+
+
+def test_top_k_and_partial_sort():
+    """ Top k returns the greatest elements and partial sort the smallest ones """
+    rand = random.Random(31)
+    values = [rand.random() for _ in range(3000)]
+    expected = sorted(values)
+
+    assert expected[::-1][:100] == QuickSort(list(values)).top_k(100)
+    assert [] == QuickSort(list(values)).top_k(0)
+
+    data = list(values)
+    QuickSort(data).partial_sort(50)
+    assert expected[:50] == data[:50]
+    assert sorted(data) == expected
+
+
+def test_select_typed_array():
+    """ Selection also works in place on typed buffers """
+    values = array('d', [5.0, 1.0, 4.0, 2.0, 3.0])
+
+    assert 3.0 == QuickSort(values).select(2)
+
+
+@pytest.mark.parametrize("mode", [QuickSort.INTROSORT, QuickSort.THREE_WAY])
+def test_key_and_reverse(mode):
+    """ Records are sorted by a key computed once per element """
+    rand = random.Random(37)
+    records = [{'id': i, 'status': rand.randrange(5)} for i in range(500)]
+    calls = []
+
+    def key(record):
+        calls.append(record)
+        return record['status']
+
+    for reverse in (False, True):
+        data = list(records)
+        del calls[:]
+        QuickSort(data, mode=mode, key=key, reverse=reverse).run()
+
+        # Both results are stable, like the builtin sort
+        assert sorted(records, key=key, reverse=reverse) == data
+        assert len(calls) == 2 * len(records)
+
+
+def test_reverse_without_key():
+    """ Reverse mode sorts lists and buffers in descending order """
+    data = [3, 1, 2]
+    QuickSort(data, reverse=True).run()
+    assert [3, 2, 1] == data
+
+    buffer = array('q', [3, 1, 2])
+    QuickSort(memoryview(buffer), reverse=True).run()
+    assert [3, 2, 1] == list(buffer)
+
+
+def test_stable_mode():
+    """ Elements comparing equal keep their original order """
+    data = [1, 1.0, True, 0, 0.0, False]
+    QuickSort(data, stable=True).run()
+
+    assert [repr(value) for value in data] == ['0', '0.0', 'False', '1', '1.0', 'True']
+
+
+def test_key_on_sorted_records():
+    """ Records already ordered by the key do not reach the recursion limit """
+    records = [{'id': number} for number in range(10000)]
+
+    QuickSort(records, key=lambda record: record['id'], reverse=True).run()
+
+    assert [record['id'] for record in records] == list(range(9999, -1, -1))
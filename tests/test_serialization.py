@@ -0,0 +1,98 @@
+""" Test for the serialization of linked lists and trees """
+import pickle
+
+import pytest
+
+from python_samples.binary_tree import AVLTreeNode, BinaryTreeNode, PersistentTreeNode
+from python_samples.custom_linked_list import CustomLinkedList, SkipList, UnrolledLinkedList
+from python_samples.serialization import dumps, loads
+
+DEPTH = 50000
+
+
+def skewed_tree() -> BinaryTreeNode:
+    """ Returns a tree with a single long right spine """
+    root = BinaryTreeNode(0)
+    node = root
+    for value in range(1, DEPTH):
+        node.right_child = BinaryTreeNode(value)
+        node = node.right_child
+    return root
+
+
+def test_pickle_deep_tree():
+    """ Pickling a skewed tree does not hit the recursion limit """
+    tree = pickle.loads(pickle.dumps(skewed_tree()))
+
+    assert list(range(DEPTH)) == list(tree.iter_in_order())
+
+
+def test_pickle_avl_tree():
+    """ The heights and sizes of an AVL tree are rebuilt on load """
+    tree = AVLTreeNode.from_iterable(range(1000))
+    loaded = pickle.loads(pickle.dumps(tree))
+
+    assert list(tree) == list(loaded)
+    assert tree.height == loaded.height
+    assert len(tree) == len(loaded)
+    assert 500 == loaded.select(500)
+
+
+def test_pickle_linked_lists():
+    """ Long linked lists keep their values and options """
+    values = list(range(DEPTH))
+    linked_list = pickle.loads(pickle.dumps(CustomLinkedList(values, doubly=True, indexed=True)))
+    assert values == [node.data for node in linked_list]
+    assert linked_list.doubly and linked_list.indexed
+    assert DEPTH - 1 == linked_list.pop_last()
+
+    unrolled = pickle.loads(pickle.dumps(UnrolledLinkedList(values)))
+    assert values == list(unrolled.values())
+
+    skip_list = pickle.loads(pickle.dumps(SkipList(reversed(values), seed=3)))
+    assert values == [node.data for node in skip_list]
+
+
+@pytest.mark.parametrize("values", [
+    list(range(-100, 100)),
+    [value / 3 for value in range(200)],
+    ["a", "b", None, 2 ** 70],
+    [2 ** 70, 1],
+])
+def test_dumps_loads_linked_list(values):
+    """ Linked lists are restored with their values and options """
+    linked_list = loads(dumps(CustomLinkedList(values, indexed=True)))
+
+    assert values == [node.data for node in linked_list]
+    # The indexed mode implies the doubly linked mode
+    assert linked_list.indexed and linked_list.doubly
+
+
+def test_dumps_loads_trees():
+    """ Trees are restored with the same shape """
+    tree = loads(dumps(skewed_tree()))
+    assert list(range(DEPTH)) == list(tree.iter_in_order())
+    assert tree.left_child is None
+
+    avl_tree = AVLTreeNode.from_iterable(range(1000))
+    loaded = loads(dumps(avl_tree))
+    assert isinstance(loaded, AVLTreeNode)
+    assert list(avl_tree.iter_pre_order()) == list(loaded.iter_pre_order())
+    assert len(avl_tree) == len(loaded)
+
+    persistent = PersistentTreeNode(2).insert(1).insert(3)
+    loaded = loads(dumps(persistent))
+    assert isinstance(loaded, PersistentTreeNode)
+    assert [1, 2, 3] == list(loaded)
+
+
+def test_dumps_loads_errors():
+    """ Unsupported structures and corrupted data are rejected """
+    with pytest.raises(TypeError):
+        dumps([1, 2, 3])
+    with pytest.raises(ValueError):
+        loads(b'short')
+    with pytest.raises(ValueError):
+        loads(b'x' * 64)
+    with pytest.raises(ValueError):
+        loads(dumps(CustomLinkedList([1, 2, 3]))[:-8])